@@ -1,6 +1,10 @@
 import os
+import re
+import threading
+import time
 import uuid
-from flask import Flask, request, jsonify, session, send_from_directory, render_template
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request, jsonify, session, send_from_directory, render_template
 from flask_login import LoginManager, login_required, current_user, logout_user
 from config import Config
 from auth.google_auth import google_auth_bp, GoogleUser
@@ -9,8 +13,16 @@ from services.voice_processor import (
     process_voice_command,
     process_text_compose_input,
     process_text_msg_input,
+    warm_tts_prompts,
+    _normalize_email_address,
+)
+from services.stt_whisper import transcribe, warm_up
+from services.email_service import (
+    fetch_emails,
+    fetch_email_body,
+    send_email,
+    invalidate_gmail_service,
 )
-from services.email_service import fetch_emails, send_email
 
 # ── Milestone 3 service imports ───────────────────────────────────────────────
 from services.messaging_service import (
@@ -34,9 +46,105 @@ from services.voice_service import speak_confirmation, check_confirmation_answer
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# ── Optional Redis session store ──────────────────────────────────────────────
+# With the default cookie sessions the user dict (Google creds included) is
+# HMAC-verified, JSON-decoded and re-signed on every request/response. When
+# SESSION_REDIS_URL is set, sessions move server-side: the cookie shrinks to a
+# signed session id and reads become a single Redis GET.
+if app.config["SESSION_REDIS_URL"]:
+    try:
+        import redis
+        from flask_session import Session
+
+        app.config.update(
+            SESSION_TYPE="redis",
+            SESSION_REDIS=redis.Redis.from_url(app.config["SESSION_REDIS_URL"]),
+            SESSION_PERMANENT=False,
+            SESSION_USE_SIGNER=True,
+        )
+        Session(app)
+    except Exception as exc:  # missing package or unreachable Redis
+        import logging
+        logging.getLogger(__name__).warning(
+            "Redis session store unavailable (%s) — using cookie sessions.", exc
+        )
+
+# ── Optional orjson responses ─────────────────────────────────────────────────
+# /emails payloads run to tens of KB; orjson (Rust, SIMD) encodes them several
+# times faster than stdlib json. Wiring it in as the app's JSON provider keeps
+# every jsonify()/get_json() call site unchanged.
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class _OrjsonProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrjsonProvider(app)
+except ImportError:
+    pass  # stdlib json is fine — orjson is an optional speed-up
+
 # Allow OAuth over plain HTTP during local development
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = app.config["OAUTHLIB_INSECURE_TRANSPORT"]
 
+# Warm up the STT compute path in the background so the first voice request
+# doesn't pay the backend's one-time kernel/thread-pool setup. The model
+# weights already load above via the service imports.
+threading.Thread(target=warm_up, name="whisper-warmup", daemon=True).start()
+
+# Pre-render the fixed spoken prompts so the first canned response of a
+# session hits the TTS render cache (no-op under CLIENT_TTS).
+threading.Thread(target=warm_tts_prompts, name="tts-warmup", daemon=True).start()
+
+# ── Stale audio sweeper ───────────────────────────────────────────────────────
+# Rendered TTS WAVs stay on disk after the client fetches them (the URL
+# contract plus the render cache need the file to linger), so the upload
+# folder grows without bound. A background thread deletes anything older
+# than _AUDIO_MAX_AGE_S; the TTS render cache revalidates with
+# os.path.exists, so sweeping a cached prompt just costs one re-render.
+_AUDIO_MAX_AGE_S  = 600
+_SWEEP_INTERVAL_S = 60
+_AUDIO_MAX_FILES  = 2048
+
+
+def _sweep_audio_folder():
+    while True:
+        time.sleep(_SWEEP_INTERVAL_S)
+        cutoff = time.time() - _AUDIO_MAX_AGE_S
+        survivors = []
+        try:
+            entries = os.scandir(app.config["UPLOAD_FOLDER"])
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime
+                if mtime < cutoff:
+                    os.unlink(entry.path)
+                else:
+                    survivors.append((mtime, entry.path))
+            except OSError:
+                pass  # already gone or in use — next sweep gets it
+        # Age alone can't bound the folder under a traffic burst — also
+        # evict oldest-first past a hard count cap so one directory never
+        # accumulates enough entries to slow lookups down.
+        if len(survivors) > _AUDIO_MAX_FILES:
+            survivors.sort()
+            for _, path in survivors[:-_AUDIO_MAX_FILES]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+threading.Thread(target=_sweep_audio_folder, name="audio-sweep", daemon=True).start()
+
 # ── Flask-Login setup ─────────────────────────────────────────────────────────
 login_manager = LoginManager(app)
 login_manager.login_view = "index"
@@ -59,18 +167,50 @@ app.register_blueprint(apppass_auth_bp)
 
 
 # ── Page routes ───────────────────────────────────────────────────────────────
+# index.html and login.html take no request context, so Jinja produces the
+# same bytes every time — render each once and replay the cached response
+# instead of paying template lookup + rendering per hit. dashboard.html stays
+# on render_template because it interpolates current_user.
+_PAGE_CACHE: dict[str, bytes] = {}
+
+
+def _static_page(template: str) -> Response:
+    body = _PAGE_CACHE.get(template)
+    if body is None:
+        body = render_template(template).encode("utf-8")
+        _PAGE_CACHE[template] = body
+    return Response(
+        body,
+        mimetype="text/html",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
 @app.route("/")
 def index():
-    return render_template("index.html")
+    return _static_page("index.html")
 
 
 @app.route("/login")
 def login_page():
-    return render_template("login.html")
+    return _static_page("login.html")
 
 
 # ── Voice login transcription (no @login_required) ────────────────────────────
 
+# Password tokens may only map to bare letters/digits — special-char names
+# like "at"/"dot" stay literal (they can't occur in an App Password, and
+# mapping them would corrupt tokens Whisper heard as ordinary words).
+_PW_SAFE_VALUES = frozenset('abcdefghijklmnopqrstuvwxyz0123456789')
+# Keys that collide with common English words Whisper may emit verbatim.
+_PW_SKIP_KEYS = frozenset({'to', 'too', 'for'})
+
+_PW_PUNCT_RE    = re.compile(r'[.,;:!?\'"()\[\]{}]')
+_PW_DOUBLE_U_RE = re.compile(r'\bdouble\s+(?:you|u)\b')
+_PW_XRAY_RE     = re.compile(r'\bx[\s\-]ray\b')
+_PW_TOKCLEAN_RE = re.compile(r'[^a-z0-9]')
+
+
 def _normalize_app_password(raw: str) -> str:
     """
     Convert Whisper's transcription of a letter-by-letter App Password
@@ -86,85 +226,35 @@ def _normalize_app_password(raw: str) -> str:
       • Stray punctuation Whisper inserts: 'a.', 'B,' etc.
       • Digit words: 'zero'…'nine'  (App Passwords sometimes include digits)
       • Multi-word: 'double you' → 'w', 'x ray' → 'x'
+
+    The letter-name table is the shared module-level _PHONETIC_CHARS map
+    (also used by the email-correction route) filtered down to entries
+    that produce a bare letter or digit.
     """
-    import re
     text = raw.strip().lower()
     # Strip punctuation Whisper inserts after single letters ('A.' 'B,' 'C;')
-    text = re.sub(r'[.,;:!?\'"()\[\]{}]', ' ', text)
+    text = _PW_PUNCT_RE.sub(' ', text)
     # Handle two-word phonetics before splitting
-    text = re.sub(r'\bdouble\s+(?:you|u)\b', 'w', text)
-    text = re.sub(r'\bx[\s\-]ray\b', 'x', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    LETTER_NAMES = {
-        # ── keep bare single letters as-is ───────────────────────────────────
-        **{c: c for c in 'abcdefghijklmnopqrstuvwxyz0123456789'},
-        # ── A ────────────────────────────────────────────────────────────────
-        'ay': 'a', 'aye': 'a', 'alpha': 'a',
-        # ── B ────────────────────────────────────────────────────────────────
-        'bee': 'b', 'be': 'b', 'bravo': 'b',
-        # ── C ────────────────────────────────────────────────────────────────
-        'see': 'c', 'sea': 'c', 'si': 'c', 'charlie': 'c',
-        # ── D ────────────────────────────────────────────────────────────────
-        'dee': 'd', 'de': 'd', 'delta': 'd',
-        # ── E ────────────────────────────────────────────────────────────────
-        'ee': 'e', 'echo': 'e',
-        # ── F ────────────────────────────────────────────────────────────────
-        'ef': 'f', 'eff': 'f', 'foxtrot': 'f',
-        # ── G ────────────────────────────────────────────────────────────────
-        'gee': 'g', 'ji': 'g', 'golf': 'g',
-        # ── H ────────────────────────────────────────────────────────────────
-        'aitch': 'h', 'haitch': 'h', 'hotel': 'h',
-        # ── I ────────────────────────────────────────────────────────────────
-        'eye': 'i', 'india': 'i',
-        # ── J ────────────────────────────────────────────────────────────────
-        'jay': 'j', 'juliett': 'j', 'juliet': 'j',
-        # ── K ────────────────────────────────────────────────────────────────
-        'kay': 'k', 'kilo': 'k',
-        # ── L ────────────────────────────────────────────────────────────────
-        'el': 'l', 'ell': 'l', 'lima': 'l',
-        # ── M ────────────────────────────────────────────────────────────────
-        'em': 'm', 'mike': 'm',
-        # ── N ────────────────────────────────────────────────────────────────
-        'en': 'n', 'november': 'n',
-        # ── O ────────────────────────────────────────────────────────────────
-        'oh': 'o', 'owe': 'o', 'oscar': 'o',
-        # ── P ────────────────────────────────────────────────────────────────
-        'pee': 'p', 'pe': 'p', 'papa': 'p',
-        # ── Q ────────────────────────────────────────────────────────────────
-        'cue': 'q', 'queue': 'q', 'quebec': 'q',
-        # ── R ────────────────────────────────────────────────────────────────
-        'are': 'r', 'ar': 'r', 'romeo': 'r',
-        # ── S ────────────────────────────────────────────────────────────────
-        'ess': 's', 'es': 's', 'sierra': 's',
-        # ── T ────────────────────────────────────────────────────────────────
-        'tee': 't', 'ti': 't', 'tango': 't',
-        # ── U ────────────────────────────────────────────────────────────────
-        'you': 'u', 'yoo': 'u', 'uniform': 'u',
-        # ── V ────────────────────────────────────────────────────────────────
-        'vee': 'v', 've': 'v', 'victor': 'v',
-        # ── W ────────────────────────────────────────────────────────────────
-        'whiskey': 'w',
-        # ── X ────────────────────────────────────────────────────────────────
-        'ex': 'x', 'eks': 'x',
-        # ── Y ────────────────────────────────────────────────────────────────
-        'why': 'y', 'yankee': 'y',
-        # ── Z ────────────────────────────────────────────────────────────────
-        'zee': 'z', 'zed': 'z', 'zulu': 'z',
-        # ── digit words ──────────────────────────────────────────────────────
-        'zero': '0', 'one': '1', 'two': '2', 'three': '3', 'four': '4',
-        'five': '5', 'six': '6', 'seven': '7', 'eight': '8', 'nine': '9',
-    }
+    text = _PW_DOUBLE_U_RE.sub('w', text)
+    text = _PW_XRAY_RE.sub('x', text)
+    text = _VC_WS_RE.sub(' ', text).strip()
+
+    # Bind hot-loop lookups to locals — this loop runs per spoken token and
+    # globals cost a dict probe on every access in CPython.
+    tok_sub = _PW_TOKCLEAN_RE.sub
+    skip_keys = _PW_SKIP_KEYS
+    char_get = _PHONETIC_CHARS.get
+    safe_values = _PW_SAFE_VALUES
 
-    tokens = text.split()
     out = []
-    for tok in tokens:
+    for tok in text.split():
         # Strip any residual punctuation glued to the token
-        tok_clean = re.sub(r'[^a-z0-9]', '', tok)
+        tok_clean = tok_sub('', tok)
         if not tok_clean:
             continue
-        if tok_clean in LETTER_NAMES:
-            out.append(LETTER_NAMES[tok_clean])
+        mapped = None if tok_clean in skip_keys else char_get(tok_clean)
+        if mapped is not None and mapped in safe_values:
+            out.append(mapped)
         else:
             # Unknown word (Whisper sometimes groups letters into a run like "abc")
             # Keep it as-is; it may already be the correct characters
@@ -179,23 +269,13 @@ def voice_login_transcribe():
     Form fields: audio=<wav>, step=email|password
     Returns: { "text": "<raw>", "normalized": "<cleaned>" }
     """
-    from services.stt_whisper import transcribe
-    from services.voice_processor import _normalize_email_address
-
     step = request.form.get("step", "email")
     if "audio" not in request.files:
         return jsonify({"error": "No audio file provided"}), 400
 
-    audio_file = request.files["audio"]
-    tmp_path = os.path.join(Config.UPLOAD_FOLDER, f"login_{uuid.uuid4().hex}.wav")
-    audio_file.save(tmp_path)
-    try:
-        raw_text = transcribe(tmp_path)
-    finally:
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
+    # Feed the upload stream straight to Whisper — soundfile reads file-likes,
+    # so there is no temp file to write, name, or clean up on this hot path.
+    raw_text = transcribe(request.files["audio"].stream)
 
     if step == "email":
         normalized = _normalize_email_address(raw_text)
@@ -280,46 +360,249 @@ _PHONETIC_CHARS = {
 }
 
 
+# Single-pass multi-pattern matcher over _PHONETIC_CHARS, built once at import.
+# Alternatives are sorted longest-first so multi-word phrases ("double you",
+# "at sign", "x ray") win over their single-word prefixes — one C-level regex
+# scan instead of a Python tokenize loop with per-position dict probes.
+_PHONETIC_SCAN_RE = re.compile(
+    r'\b(?:'
+    + '|'.join(sorted((re.escape(k) for k in _PHONETIC_CHARS), key=len, reverse=True))
+    + r')\b'
+)
+
+
+# ── Precompiled correction-command patterns (compiled once at import) ─────────
+# _vc_clean helpers
+_VC_FILLER_RE = re.compile(
+    r'^(?:the letter|letter|the number|number|the character|character|the digit|digit|the)\s+'
+)
+_VC_PUNCT_RE   = re.compile(r'[.,;:!?\'"()\[\]{}-]')
+_VC_WS_RE      = re.compile(r'\s+')
+_VC_CLEANUP_RE = re.compile(r'[^a-z0-9@._+\-]')
+
+
 def _vc_clean(text: str) -> str:
     """
     Convert a spoken phrase into the actual email characters it represents.
     Handles: phonetic letter names, NATO alphabet, digit words, special char names,
     multi-token phrases like 'double you', bare letters/digits, and mixed strings.
     """
-    import re
     text = text.strip().lower()
     # Strip leading spoken fillers
-    text = re.sub(
-        r'^(?:the letter|letter|the number|number|the character|character|the digit|digit|the)\s+',
-        '', text
-    )
-    # Normalise punctuation Whisper inserts ('A.' 'B,')
-    text = re.sub(r'[.,;:!?\'"()\[\]{}]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _VC_FILLER_RE.sub('', text)
+    # Normalise punctuation Whisper inserts ('A.' 'B,'); hyphens become spaces
+    # so "x-ray" matches the "x ray" phrase entry.
+    text = _VC_PUNCT_RE.sub(' ', text)
+    text = _VC_WS_RE.sub(' ', text).strip()
+
+    # Map every known phrase/token in one scan, longest match first
+    mapped = _PHONETIC_SCAN_RE.sub(lambda m: _PHONETIC_CHARS[m.group(0)], text)
+    # Drop separators; unknown tokens pass through (may already be correct chars)
+    return _VC_CLEANUP_RE.sub('', mapped)
+
+
+# voice_correct_email command grammar — one precompiled pattern per branch,
+# tried in priority order. Branch ORDER decides which correction fires (a
+# fused alternation would hand that decision to leftmost match position:
+# "change the domain to yahoo" must hit the domain branch even though the
+# replace branch's verb matches earlier in the string). The handler table
+# below does the string surgery.
+_CMD_BRANCHES: list[tuple[str, str]] = [
+    ("rewrite",
+     r'(?:whole email is|redo(?:\s+as)?|retype(?:\s+as)?|entire(?:\s+address)? is|'
+     r'email(?:\s+address)? (?:is|should be)|my email is)\s+(?P<rewrite_arg>.+)'),
+    ("domain",
+     r'(?:domain (?:is|should be|to|as)|change domain to|set domain to|'
+     r'domain name is)\s+(?P<domain_arg>.+)'),
+    ("replace",
+     r'(?:replace|change|fix|make|turn|set|correct|swap|edit)\s+(?P<replace_old>.+?)'
+     r'\s+(?:with|to|by|as|into|for)\s+(?P<replace_new>.+)'),
+    ("add_before",
+     r'(?:add|insert|put|place|type)\s+(?P<before_char>.+?)\s+before\s+(?P<before_ref>.+)'),
+    ("add_after",
+     r'(?:add|insert|put|place|type)\s+(?P<after_char>.+?)\s+after\s+(?P<after_ref>.+)'),
+    ("add_pos",
+     r'(?:add|insert|put)\s+(?P<pos_char>.+?)\s+at\s+position\s+(?P<pos_num>\d+)'),
+    ("add_end",
+     r'(?:add|append|put|insert|place|type)\s+(?P<end_char>.+?)\s+'
+     r'(?:at the end|at end|to the end|to end|at last|in the end)'),
+    ("add_start",
+     r'(?:add|prepend|put|insert|place|type)\s+(?P<start_char>.+?)\s+'
+     r'(?:at the start|at start|to the start|at beginning|at the beginning|'
+     r'in the beginning|at front|at the front|to the front)'),
+    ("del_last",
+     r'(?:remove|delete|take out|erase|drop)\s+(?:the\s+)?last\s+(?:letter|char|character)?'),
+    ("del_first",
+     r'(?:remove|delete|take out|erase|drop)\s+(?:the\s+)?first\s+(?:letter|char|character)?'),
+    ("remove",
+     r'(?:remove|delete|take out|drop|erase|eliminate|strip)\s+(?P<remove_arg>.+)'),
+    ("move_end",   r'move\s+(?P<mvend_char>.+?)\s+to\s+(?:the\s+)?end'),
+    ("move_start", r'move\s+(?P<mvstart_char>.+?)\s+to\s+(?:the\s+)?(?:start|beginning|front)'),
+    # Standalone "fix X" (no replacement clause) — same effect as remove.
+    # Must come after the replace branch so "fix X to Y" keeps its meaning.
+    ("fix", r'^(?:fix|correct)\s+(?P<fix_arg>.+)$'),
+]
+_CMD_PATTERNS = [(name, re.compile(pat)) for name, pat in _CMD_BRANCHES]
+
+# Map spoken domain words: "gmail" → "gmail.com", "yahoo" → "yahoo.com", etc.
+_DOMAIN_SPOKEN_MAP = {
+    'gmail': 'gmail.com', 'google mail': 'gmail.com',
+    'yahoo': 'yahoo.com', 'hotmail': 'hotmail.com',
+    'outlook': 'outlook.com', 'icloud': 'icloud.com',
+    'proton': 'protonmail.com', 'protonmail': 'protonmail.com',
+}
 
-    # Try full phrase first (e.g. "double you", "at sign", "x ray")
-    if text in _PHONETIC_CHARS:
-        return _PHONETIC_CHARS[text]
 
-    # Tokenise and map each token
-    tokens = text.split()
-    out = []
-    i = 0
-    while i < len(tokens):
-        # Try two-token phrases first
-        if i + 1 < len(tokens):
-            two = tokens[i] + ' ' + tokens[i + 1]
-            if two in _PHONETIC_CHARS:
-                out.append(_PHONETIC_CHARS[two])
-                i += 2
-                continue
-        tok = re.sub(r'[^a-z0-9]', '', tokens[i])
-        if tok in _PHONETIC_CHARS:
-            out.append(_PHONETIC_CHARS[tok])
-        elif tok:
-            out.append(tok)   # unknown → keep as-is (may already be correct chars)
-        i += 1
-    return ''.join(out)
+def _replace_first(source: str, old: str, new: str) -> tuple[str, bool]:
+    """Replace first occurrence of old in source; return (new_source, found)."""
+    if old in source:
+        return source.replace(old, new, 1), True
+    return source, False
+
+
+# ── Correction handlers ───────────────────────────────────────────────────────
+# Each takes (match, local, domain) and returns
+# (changed, new_local, new_domain, message).
+
+def _cmd_rewrite(m, local, domain):
+    raw = m.group('rewrite_arg').strip()
+    # If they say the full address (contains "at" or "@"), normalise it
+    new_email = _vc_clean(raw) if '@' not in raw else raw.replace(' ', '').lower()
+    if '@' not in new_email:
+        # They probably only said the local part
+        new_local, new_domain = new_email, domain
+    else:
+        new_local, new_domain = new_email.split('@', 1)
+    return True, new_local, new_domain, "Email rewritten to " + new_local + "@" + new_domain
+
+
+def _cmd_domain(m, local, domain):
+    raw_domain = m.group('domain_arg').strip()
+    new_domain = _DOMAIN_SPOKEN_MAP.get(raw_domain, _vc_clean(raw_domain))
+    return True, local, new_domain, "Domain changed to " + new_domain
+
+
+def _cmd_replace(m, local, domain):
+    old = _vc_clean(m.group('replace_old').strip())
+    new = _vc_clean(m.group('replace_new').strip())
+    new_local, found = _replace_first(local, old, new)
+    if found:
+        return True, new_local, domain, "Replaced '" + old + "' with '" + new + "'"
+    new_domain, found = _replace_first(domain, old, new)
+    if found:
+        return True, local, new_domain, "Replaced '" + old + "' with '" + new + "' in domain"
+    return False, local, domain, "Could not find '" + old + "' in the email address"
+
+
+def _cmd_add_before(m, local, domain):
+    char = _vc_clean(m.group('before_char').strip())
+    ref  = _vc_clean(m.group('before_ref').strip())
+    if ref in local:
+        pos = local.find(ref)
+        return True, local[:pos] + char + local[pos:], domain, \
+            "Added '" + char + "' before '" + ref + "'"
+    if ref in domain:
+        pos = domain.find(ref)
+        return True, local, domain[:pos] + char + domain[pos:], \
+            "Added '" + char + "' before '" + ref + "' in domain"
+    return False, local, domain, "Could not find '" + ref + "' in the email address"
+
+
+def _cmd_add_after(m, local, domain):
+    char = _vc_clean(m.group('after_char').strip())
+    ref  = _vc_clean(m.group('after_ref').strip())
+    if ref in local:
+        pos = local.find(ref) + len(ref)
+        return True, local[:pos] + char + local[pos:], domain, \
+            "Added '" + char + "' after '" + ref + "'"
+    if ref in domain:
+        pos = domain.find(ref) + len(ref)
+        return True, local, domain[:pos] + char + domain[pos:], \
+            "Added '" + char + "' after '" + ref + "' in domain"
+    return False, local, domain, "Could not find '" + ref + "' in the email address"
+
+
+def _cmd_add_pos(m, local, domain):
+    char = _vc_clean(m.group('pos_char').strip())
+    pos  = int(m.group('pos_num')) - 1   # 1-based → 0-based
+    pos  = max(0, min(pos, len(local)))
+    new_local = local[:pos] + char + local[pos:]
+    return True, new_local, domain, "Inserted '" + char + "' at position " + str(pos + 1)
+
+
+def _cmd_add_end(m, local, domain):
+    char = _vc_clean(m.group('end_char').strip())
+    return True, local + char, domain, "Added '" + char + "' at end"
+
+
+def _cmd_add_start(m, local, domain):
+    char = _vc_clean(m.group('start_char').strip())
+    return True, char + local, domain, "Added '" + char + "' at start"
+
+
+def _cmd_del_last(m, local, domain):
+    if local:
+        return True, local[:-1], domain, "Removed last character '" + local[-1] + "'"
+    return False, local, domain, "Local part is already empty"
+
+
+def _cmd_del_first(m, local, domain):
+    if local:
+        return True, local[1:], domain, "Removed first character '" + local[0] + "'"
+    return False, local, domain, "Local part is already empty"
+
+
+def _cmd_remove(m, local, domain):
+    char = _vc_clean(m.group('remove_arg').strip())
+    new_local, found = _replace_first(local, char, '')
+    if found:
+        return True, new_local, domain, "Removed '" + char + "'"
+    new_domain, found = _replace_first(domain, char, '')
+    if found:
+        return True, local, new_domain, "Removed '" + char + "' from domain"
+    return False, local, domain, "Could not find '" + char + "' in the email address"
+
+
+def _cmd_move_end(m, local, domain):
+    char = _vc_clean(m.group('mvend_char').strip())
+    if char in local:
+        return True, local.replace(char, '', 1) + char, domain, \
+            "Moved '" + char + "' to end"
+    return False, local, domain, "Could not find '" + char + "'"
+
+
+def _cmd_move_start(m, local, domain):
+    char = _vc_clean(m.group('mvstart_char').strip())
+    if char in local:
+        return True, char + local.replace(char, '', 1), domain, \
+            "Moved '" + char + "' to start"
+    return False, local, domain, "Could not find '" + char + "'"
+
+
+def _cmd_fix(m, local, domain):
+    char = _vc_clean(m.group('fix_arg').strip())
+    new_local, found = _replace_first(local, char, '')
+    if found:
+        return True, new_local, domain, "Removed '" + char + "'"
+    return False, local, domain, "Could not find '" + char + "' to fix"
+
+
+_CMD_HANDLERS = {
+    "rewrite":    _cmd_rewrite,
+    "domain":     _cmd_domain,
+    "replace":    _cmd_replace,
+    "add_before": _cmd_add_before,
+    "add_after":  _cmd_add_after,
+    "add_pos":    _cmd_add_pos,
+    "add_end":    _cmd_add_end,
+    "add_start":  _cmd_add_start,
+    "del_last":   _cmd_del_last,
+    "del_first":  _cmd_del_first,
+    "remove":     _cmd_remove,
+    "move_end":   _cmd_move_end,
+    "move_start": _cmd_move_start,
+    "fix":        _cmd_fix,
+}
 
 
 @app.route("/voice/correct-email", methods=["POST"])
@@ -342,7 +625,6 @@ def voice_correct_email():
       the domain is/should be X          → replace domain
       redo / retype / whole email is X   → rewrite entire address
     """
-    import re
     data    = request.json or {}
     email   = data.get("email", "").strip().lower()
     command = data.get("command", "").strip().lower()
@@ -355,179 +637,27 @@ def voice_correct_email():
     else:
         local, domain = email, "gmail.com"
 
-    def _ok(new_local, new_domain, message):
-        c = new_local + "@" + new_domain
-        return jsonify({"corrected": c, "message": message, "changed": True})
-
-    def _no_change(reason):
-        return jsonify({"corrected": email, "message": reason, "changed": False})
-
-    def _find_and_replace(source, old, new):
-        """Replace first occurrence of old in source; return (new_source, found)."""
-        if old in source:
-            return source.replace(old, new, 1), True
-        return source, False
-
-    # ── Whole-email rewrite: "the email is X" / "redo as X" / "whole email is X" ─
-    m = re.search(
-        r'(?:whole email is|redo(?:\s+as)?|retype(?:\s+as)?|entire(?:\s+address)? is|'
-        r'email(?:\s+address)? (?:is|should be)|my email is)\s+(.+)', command)
-    if m:
-        raw = m.group(1).strip()
-        # If they say the full address (contains "at" or "@"), normalise it
-        new_email = _vc_clean(raw) if '@' not in raw else raw.replace(' ', '').lower()
-        if '@' not in new_email:
-            # They probably only said the local part
-            new_local = new_email; new_domain = domain
-        else:
-            new_local, new_domain = new_email.split('@', 1)
-        return _ok(new_local, new_domain, "Email rewritten to " + new_local + "@" + new_domain)
-
-    # ── Domain replacement: "the domain is/should be X" / "change domain to X" ──
-    m = re.search(
-        r'(?:domain (?:is|should be|to|as)|change domain to|set domain to|'
-        r'domain name is)\s+(.+)', command)
-    if m:
-        raw_domain = m.group(1).strip()
-        # Map spoken words: "gmail" → "gmail.com", "yahoo" → "yahoo.com", etc.
-        domain_map = {
-            'gmail': 'gmail.com', 'google mail': 'gmail.com',
-            'yahoo': 'yahoo.com', 'hotmail': 'hotmail.com',
-            'outlook': 'outlook.com', 'icloud': 'icloud.com',
-            'proton': 'protonmail.com', 'protonmail': 'protonmail.com',
-        }
-        new_domain = domain_map.get(raw_domain, _vc_clean(raw_domain))
-        return _ok(local, new_domain, "Domain changed to " + new_domain)
-
-    # ── replace / change / fix / make / turn / set / correct X to/with/as Y ──────
-    m = re.search(
-        r'(?:replace|change|fix|make|turn|set|correct|swap|edit)\s+(.+?)'
-        r'\s+(?:with|to|by|as|into|for)\s+(.+)', command)
-    if m:
-        old = _vc_clean(m.group(1).strip())
-        new = _vc_clean(m.group(2).strip())
-        new_local, found = _find_and_replace(local, old, new)
-        if found:
-            return _ok(new_local, domain, "Replaced '" + old + "' with '" + new + "'")
-        new_domain, found = _find_and_replace(domain, old, new)
-        if found:
-            return _ok(local, new_domain, "Replaced '" + old + "' with '" + new + "' in domain")
-        return _no_change("Could not find '" + old + "' in the email address")
-
-    # ── "fix X" alone (shorthand for "fix X" with no replacement — same as remove) ─
-    # Only treat as standalone fix if no "to/with" clause was found above
-    m_fix = re.search(r'^(?:fix|correct)\s+(.+)$', command)
-
-    # ── add / insert X before Y ──────────────────────────────────────────────
-    m = re.search(r'(?:add|insert|put|place|type)\s+(.+?)\s+before\s+(.+)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        ref  = _vc_clean(m.group(2).strip())
-        if ref in local:
-            pos   = local.find(ref)
-            return _ok(local[:pos] + char + local[pos:], domain,
-                       "Added '" + char + "' before '" + ref + "'")
-        if ref in domain:
-            pos   = domain.find(ref)
-            return _ok(local, domain[:pos] + char + domain[pos:],
-                       "Added '" + char + "' before '" + ref + "' in domain")
-        return _no_change("Could not find '" + ref + "' in the email address")
-
-    # ── add / insert X after Y ───────────────────────────────────────────────
-    m = re.search(r'(?:add|insert|put|place|type)\s+(.+?)\s+after\s+(.+)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        ref  = _vc_clean(m.group(2).strip())
-        if ref in local:
-            pos   = local.find(ref) + len(ref)
-            return _ok(local[:pos] + char + local[pos:], domain,
-                       "Added '" + char + "' after '" + ref + "'")
-        if ref in domain:
-            pos   = domain.find(ref) + len(ref)
-            return _ok(local, domain[:pos] + char + domain[pos:],
-                       "Added '" + char + "' after '" + ref + "' in domain")
-        return _no_change("Could not find '" + ref + "' in the email address")
-
-    # ── add X at position N ──────────────────────────────────────────────────
-    m = re.search(r'(?:add|insert|put)\s+(.+?)\s+at\s+position\s+(\d+)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        pos  = int(m.group(2)) - 1   # 1-based → 0-based
-        pos  = max(0, min(pos, len(local)))
-        new_local = local[:pos] + char + local[pos:]
-        return _ok(new_local, domain, "Inserted '" + char + "' at position " + str(pos + 1))
-
-    # ── add / append X at end ────────────────────────────────────────────────
-    m = re.search(
-        r'(?:add|append|put|insert|place|type)\s+(.+?)\s+'
-        r'(?:at the end|at end|to the end|to end|at last|in the end)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        return _ok(local + char, domain, "Added '" + char + "' at end")
-
-    # ── add / prepend X at start ─────────────────────────────────────────────
-    m = re.search(
-        r'(?:add|prepend|put|insert|place|type)\s+(.+?)\s+'
-        r'(?:at the start|at start|to the start|at beginning|at the beginning|'
-        r'in the beginning|at front|at the front|to the front)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        return _ok(char + local, domain, "Added '" + char + "' at start")
-
-    # ── remove / delete last letter ──────────────────────────────────────────
-    if re.search(r'(?:remove|delete|take out|erase|drop)\s+(?:the\s+)?last\s+(?:letter|char|character)?', command):
-        if local:
-            return _ok(local[:-1], domain, "Removed last character '" + local[-1] + "'")
-        return _no_change("Local part is already empty")
-
-    # ── remove / delete first letter ─────────────────────────────────────────
-    if re.search(r'(?:remove|delete|take out|erase|drop)\s+(?:the\s+)?first\s+(?:letter|char|character)?', command):
-        if local:
-            return _ok(local[1:], domain, "Removed first character '" + local[0] + "'")
-        return _no_change("Local part is already empty")
-
-    # ── remove / delete X (general) ──────────────────────────────────────────
-    m = re.search(r'(?:remove|delete|take out|drop|erase|eliminate|strip)\s+(.+)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        new_local, found = _find_and_replace(local, char, '')
-        if found:
-            return _ok(new_local, domain, "Removed '" + char + "'")
-        new_domain, found = _find_and_replace(domain, char, '')
-        if found:
-            return _ok(local, new_domain, "Removed '" + char + "' from domain")
-        return _no_change("Could not find '" + char + "' in the email address")
-
-    # ── move X to end ────────────────────────────────────────────────────────
-    m = re.search(r'move\s+(.+?)\s+to\s+(?:the\s+)?end', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        if char in local:
-            new_local = local.replace(char, '', 1) + char
-            return _ok(new_local, domain, "Moved '" + char + "' to end")
-        return _no_change("Could not find '" + char + "'")
-
-    # ── move X to start ───────────────────────────────────────────────────────
-    m = re.search(r'move\s+(.+?)\s+to\s+(?:the\s+)?(?:start|beginning|front)', command)
-    if m:
-        char = _vc_clean(m.group(1).strip())
-        if char in local:
-            new_local = char + local.replace(char, '', 1)
-            return _ok(new_local, domain, "Moved '" + char + "' to start")
-        return _no_change("Could not find '" + char + "'")
-
-    # ── standalone "fix X" (no replacement given) → same as remove ───────────
-    if m_fix:
-        char = _vc_clean(m_fix.group(1).strip())
-        new_local, found = _find_and_replace(local, char, '')
-        if found:
-            return _ok(new_local, domain, "Removed '" + char + "'")
-        return _no_change("Could not find '" + char + "' to fix")
-
-    return _no_change(
-        "Could not understand the correction. "
-        "Try: replace X with Y, add X before Y, remove X, or fix X to Y"
-    )
+    # First branch whose pattern matches wins — priority is the list order
+    for name, pat in _CMD_PATTERNS:
+        m = pat.search(command)
+        if m:
+            changed, new_local, new_domain, message = _CMD_HANDLERS[name](m, local, domain)
+            if changed:
+                return jsonify({
+                    "corrected": new_local + "@" + new_domain,
+                    "message":   message,
+                    "changed":   True,
+                })
+            return jsonify({"corrected": email, "message": message, "changed": False})
+
+    return jsonify({
+        "corrected": email,
+        "changed":   False,
+        "message": (
+            "Could not understand the correction. "
+            "Try: replace X with Y, add X before Y, remove X, or fix X to Y"
+        ),
+    })
 
 
 @app.route("/dashboard")
@@ -617,11 +747,15 @@ def voice_service_greeting():
     if not text:
         text = translate_text(_text_en, lang) or _text_en
 
-    tts_path  = speak_multilang(text, lang=lang)
-    audio_url = f"/static/audio/{os.path.basename(tts_path)}" if tts_path else None
+    audio_url = None
+    if not Config.CLIENT_TTS:
+        tts_path  = speak_multilang(text, lang=lang)
+        audio_url = f"/static/audio/{os.path.basename(tts_path)}" if tts_path else None
     return jsonify({
         "audio_url":    audio_url,
         "response_text": text,
+        "client_tts":   Config.CLIENT_TTS,
+        "speak_text":   text if Config.CLIENT_TTS else None,
         "voice_lang":   lang,
     })
 
@@ -665,7 +799,42 @@ def voice_msg_compose_text():
 @login_required
 def get_emails():
     emails = fetch_emails(session)
-    return jsonify({"emails": emails})
+    # ETag on the rendered payload → unchanged inboxes answer revalidations
+    # with an empty 304 instead of re-sending tens of KB of metadata.
+    resp = jsonify({"emails": emails})
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+@app.route("/emails/<msg_id>/body")
+@login_required
+def get_email_body(msg_id):
+    """Hydrate one message body — the inbox list itself is metadata-only."""
+    return jsonify({"body": fetch_email_body(session, msg_id)})
+
+
+# Background sends: SMTP/Gmail-API can block for seconds on a slow or
+# throttled server. With "async": true in the payload the send is handed to a
+# small worker pool and the request returns 202 immediately with a job id the
+# client polls. In-process (executor + job dict) rather than a Redis/RQ queue
+# — the app keeps all other shared state in-process too.
+_SEND_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="send-email")
+_SEND_JOBS: dict[str, dict] = {}
+_SEND_JOBS_MAX = 100
+
+
+def _run_send_job(job_id: str, session_data: dict, to_addr: str, subject: str, body: str):
+    try:
+        success, message = send_email(session_data, to_addr, subject, body)
+    except Exception as exc:
+        success, message = False, str(exc)
+    # Assign, don't mutate — re-creates the record if eviction raced us, so
+    # the client's poll always finds a terminal status.
+    _SEND_JOBS[job_id] = {
+        "status": "finished" if success else "failed",
+        "success": success,
+        "message": message,
+    }
 
 
 @app.route("/send-email", methods=["POST"])
@@ -679,21 +848,53 @@ def send_email_route():
     if not to_addr or not subject or not body:
         return jsonify({"error": "Missing required fields"}), 400
 
+    if data.get("async"):
+        if len(_SEND_JOBS) >= _SEND_JOBS_MAX:
+            # Evict oldest-first, but only records whose job has finished —
+            # a queued/running job's record must survive until its worker
+            # reports, or the client would poll 404 forever.
+            done = [jid for jid, job in _SEND_JOBS.items()
+                    if job.get("status") in ("finished", "failed")]
+            for jid in done[: len(_SEND_JOBS) - _SEND_JOBS_MAX + 1]:
+                _SEND_JOBS.pop(jid, None)
+        job_id = uuid.uuid4().hex
+        _SEND_JOBS[job_id] = {"status": "queued", "success": None, "message": ""}
+        # Copy the session — the worker thread runs outside the request context.
+        _SEND_EXECUTOR.submit(_run_send_job, job_id, dict(session), to_addr, subject, body)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
     success, message = send_email(session, to_addr, subject, body)
     status = 200 if success else 500
     return jsonify({"success": success, "message": message}), status
 
 
+@app.route("/send-email/<job_id>")
+@login_required
+def send_email_status(job_id):
+    """Poll the status of an async send started via {"async": true}."""
+    job = _SEND_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify({"job_id": job_id, **job})
+
+
 # ── Serve TTS audio ───────────────────────────────────────────────────────────
 @app.route("/static/audio/<path:filename>")
 def serve_audio(filename):
-    return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+    # TTS filenames embed a fresh uuid/hex token, so the content behind a
+    # given name never changes — let browsers cache aggressively instead of
+    # refetching hundreds of KB of audio per dashboard action.
+    # (send_from_directory already handles conditional requests / Range.)
+    resp = send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+    resp.headers["Cache-Control"] = "public, max-age=86400, immutable"
+    return resp
 
 
 # ── Logout ────────────────────────────────────────────────────────────────────
 @app.route("/logout")
 @login_required
 def logout():
+    invalidate_gmail_service(session)
     logout_user()
     session.clear()
     return jsonify({"message": "Logged out"}), 200
@@ -866,6 +1067,21 @@ def telegram_auth_verify():
 
 # ── Feature 2: Summarization ──────────────────────────────────────────────────
 
+def _summarize_payload(data: dict, mode: str):
+    """Dispatch a /summarize-style JSON payload to the right summarizer.
+
+    Returns the summary string, or None when the payload carries none of
+    'email' / 'message' / 'text' (shared by /summarize and /summarize/tts).
+    """
+    if "email" in data:
+        return summarize_email(data["email"], mode=mode)
+    if "message" in data:
+        return summarize_message(data["message"], mode=mode)
+    if "text" in data:
+        return summarize_text(data["text"], mode=mode)
+    return None
+
+
 @app.route("/summarize", methods=["POST"])
 @login_required
 def summarize_route():
@@ -882,13 +1098,8 @@ def summarize_route():
     data = request.get_json(force=True) or {}
     mode = data.get("mode", Config.SUMMARIZATION_MODE)
 
-    if "email" in data:
-        summary = summarize_email(data["email"], mode=mode)
-    elif "message" in data:
-        summary = summarize_message(data["message"], mode=mode)
-    elif "text" in data:
-        summary = summarize_text(data["text"], mode=mode)
-    else:
+    summary = _summarize_payload(data, mode)
+    if summary is None:
         return jsonify({"error": "Provide 'text', 'email', or 'message' in request body"}), 400
 
     return jsonify({"summary": summary})
@@ -906,13 +1117,8 @@ def summarize_tts_route():
     mode    = data.get("mode", Config.SUMMARIZATION_MODE)
     lang    = data.get("lang", Config.DEFAULT_LANGUAGE)
 
-    if "email" in data:
-        summary = summarize_email(data["email"], mode=mode)
-    elif "message" in data:
-        summary = summarize_message(data["message"], mode=mode)
-    elif "text" in data:
-        summary = summarize_text(data["text"], mode=mode)
-    else:
+    summary = _summarize_payload(data, mode)
+    if summary is None:
         return jsonify({"error": "Provide 'text', 'email', or 'message'"}), 400
 
     out_path  = os.path.join(Config.UPLOAD_FOLDER, f"summary_{uuid.uuid4().hex}.wav")
@@ -1084,4 +1290,6 @@ def language_tts_demo():
 
 
 if __name__ == "__main__":
-    app.run(debug=app.config["DEBUG"], port=5000)
+    # threaded=True so a long STT/TTS request doesn't serialize other users
+    # on the dev server. For production serve via asgi.py (uvicorn/hypercorn).
+    app.run(debug=app.config["DEBUG"], port=5000, threaded=True)
@@ -0,0 +1,19 @@
+"""
+ASGI entrypoint — serve the Flask app under uvicorn/hypercorn.
+
+The Werkzeug dev server (``python app.py``) is single-process and fine for
+local use, but STT/TTS calls block a worker for hundreds of ms each, so
+concurrent users serialize.  Wrapping the WSGI app with asgiref lets an
+async server overlap the network I/O (audio upload, IMAP/SMTP) of many
+requests while the blocking STT work runs in the server's thread pool.
+
+Usage:
+    pip install asgiref uvicorn        # or hypercorn
+    uvicorn asgi:app --workers 4
+    hypercorn asgi:app --workers 4
+"""
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app as flask_app
+
+app = WsgiToAsgi(flask_app)
@@ -2,13 +2,45 @@
 Gmail App Password login — authenticates via IMAP to verify credentials,
 then stores them in the Flask session for SMTP/IMAP operations.
 """
+import hashlib
 import imaplib
+import threading
+import time
 from flask import Blueprint, request, jsonify, session, redirect, url_for
 from flask_login import login_user, UserMixin
 from config import Config
 
 apppass_auth_bp = Blueprint("apppass_auth", __name__)
 
+# Successful verifications are remembered briefly so a repeat login from the
+# same user skips the TLS handshake + IMAP LOGIN round-trip (~0.5-1 s). Only
+# the password's hash is kept, only successes are cached, and entries expire
+# after a few minutes so a revoked App Password stops working promptly.
+_CRED_CACHE_TTL = 300  # seconds
+_cred_cache: dict[tuple[str, bytes], float] = {}
+_cred_lock = threading.Lock()
+
+
+def _cred_key(email: str, password: str) -> tuple[str, bytes]:
+    return (email, hashlib.sha256(password.encode()).digest())
+
+
+def _creds_recently_verified(email: str, password: str) -> bool:
+    key = _cred_key(email, password)
+    with _cred_lock:
+        expires = _cred_cache.get(key)
+        if expires is None:
+            return False
+        if expires < time.time():
+            _cred_cache.pop(key, None)
+            return False
+        return True
+
+
+def _remember_creds(email: str, password: str) -> None:
+    with _cred_lock:
+        _cred_cache[_cred_key(email, password)] = time.time() + _CRED_CACHE_TTL
+
 
 # ── User model ────────────────────────────────────────────────────────────────
 class AppPasswordUser(UserMixin):
@@ -42,15 +74,17 @@ def app_password_login():
     if not email or not password:
         return jsonify({"error": "Email and password are required"}), 400
 
-    # Verify credentials with IMAP
-    try:
-        mail = imaplib.IMAP4_SSL(Config.GMAIL_IMAP_HOST)
-        mail.login(email, password)
-        mail.logout()
-    except imaplib.IMAP4.error:
-        return jsonify({"error": "Invalid credentials"}), 401
-    except Exception as exc:
-        return jsonify({"error": f"Connection failed: {exc}"}), 503
+    # Verify credentials with IMAP (skipped if verified in the last few minutes)
+    if not _creds_recently_verified(email, password):
+        try:
+            mail = imaplib.IMAP4_SSL(Config.GMAIL_IMAP_HOST)
+            mail.login(email, password)
+            mail.logout()
+        except imaplib.IMAP4.error:
+            return jsonify({"error": "Invalid credentials"}), 401
+        except Exception as exc:
+            return jsonify({"error": f"Connection failed: {exc}"}), 503
+        _remember_creds(email, password)
 
     user = AppPasswordUser(email=email)
     session["user"] = user.to_dict()
@@ -4,7 +4,11 @@ Stores OAuth credentials in Flask session so they survive requests.
 """
 from __future__ import annotations
 import json
-from flask import Blueprint, redirect, request, session, url_for
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import Blueprint, has_request_context, redirect, request, session, url_for
 from flask_login import login_user, UserMixin
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
@@ -15,6 +19,37 @@ from config import Config
 
 google_auth_bp = Blueprint("google_auth", __name__)
 
+logger = logging.getLogger(__name__)
+
+# ── Preemptive token refresh ──────────────────────────────────────────────────
+# Waiting for creds.expired means the unlucky request eats the ~200-500 ms
+# refresh round-trip inline, once an hour. Instead, when a token is within
+# _REFRESH_MARGIN_S of expiry we refresh it on a background thread and keep
+# serving the still-valid token; the refreshed credentials land in
+# _refreshed_creds and get persisted to the session on the next request.
+_REFRESH_MARGIN_S = 300
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="oauth-refresh")
+_refresh_lock = threading.Lock()
+_refresh_inflight: set[str] = set()
+_refreshed_creds: dict[str, Credentials] = {}
+
+
+def _seconds_to_expiry(creds: Credentials) -> float | None:
+    if creds.expiry is None:
+        return None
+    return (creds.expiry - datetime.utcnow()).total_seconds()
+
+
+def _background_refresh(email: str, creds: Credentials) -> None:
+    try:
+        creds.refresh(Request())
+        _refreshed_creds[email] = creds
+    except Exception as exc:
+        logger.warning("Background token refresh failed for %s: %s", email, exc)
+    finally:
+        with _refresh_lock:
+            _refresh_inflight.discard(email)
+
 
 # ── User model ────────────────────────────────────────────────────────────────
 class GoogleUser(UserMixin):
@@ -45,12 +80,49 @@ class GoogleUser(UserMixin):
         }
 
     def get_credentials(self) -> Credentials:
-        """Return a refreshed Credentials object."""
-        creds = Credentials(**self.credentials_dict)
+        """Return valid Credentials, refreshing preemptively when near expiry."""
+        # A background refresh may already have produced newer credentials
+        cached = _refreshed_creds.get(self.email)
+        if cached is not None:
+            ttl = _seconds_to_expiry(cached)
+            if ttl is not None and ttl > _REFRESH_MARGIN_S:
+                fresh = _creds_to_dict(cached)
+                # Only persist through the request-bound session proxy when a
+                # request context exists — background send workers call this
+                # too, and the returned Credentials are all they need. Once
+                # persisted the staging entry has done its job; drop it so it
+                # can't be served stale for the rest of the token's lifetime.
+                if has_request_context():
+                    session["user"]["credentials"] = fresh
+                    _refreshed_creds.pop(self.email, None)
+                # Hand out a private copy — the staged Credentials object is
+                # shared module state and must not be mutated per request.
+                return _creds_from_dict(fresh)
+            _refreshed_creds.pop(self.email, None)
+
+        creds = _creds_from_dict(self.credentials_dict)
+
+        # Hard-expired: nothing to serve — refresh inline
         if creds.expired and creds.refresh_token:
             creds.refresh(Request())
-            # Persist refreshed token back to session
-            session["user"]["credentials"] = _creds_to_dict(creds)
+            # Persist refreshed token back to session (request threads only —
+            # see above; a worker thread just uses the refreshed object)
+            if has_request_context():
+                session["user"]["credentials"] = _creds_to_dict(creds)
+            return creds
+
+        # Still valid but close to expiry: refresh a copy in the background
+        # while this request proceeds on the current token
+        ttl = _seconds_to_expiry(creds)
+        if creds.refresh_token and ttl is not None and ttl < _REFRESH_MARGIN_S:
+            with _refresh_lock:
+                if self.email not in _refresh_inflight:
+                    _refresh_inflight.add(self.email)
+                    _refresh_executor.submit(
+                        _background_refresh,
+                        self.email,
+                        _creds_from_dict(_creds_to_dict(creds)),
+                    )
         return creds
 
 
@@ -76,9 +148,20 @@ def _creds_to_dict(creds: Credentials) -> dict:
         "client_id": creds.client_id,
         "client_secret": creds.client_secret,
         "scopes": list(creds.scopes or []),
+        # Serialised so staleness can be judged without a probe request
+        "expiry": creds.expiry.isoformat() if creds.expiry else None,
     }
 
 
+def _creds_from_dict(data: dict) -> Credentials:
+    data = dict(data)
+    expiry = data.pop("expiry", None)  # Credentials() wants a datetime, not str
+    creds = Credentials(**data)
+    if expiry:
+        creds.expiry = datetime.fromisoformat(expiry)
+    return creds
+
+
 # ── Routes ─────────────────────────────────────────────────────────────────────
 @google_auth_bp.route("/login/google")
 def google_login():
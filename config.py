@@ -11,10 +11,24 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production")
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
 
+    # Optional server-side session store (Redis via flask-session).
+    # The default signed-cookie session re-serializes and re-signs the whole
+    # user dict (including Google OAuth tokens) on every response; pointing
+    # SESSION_REDIS_URL at a Redis instance keeps only the session id in the
+    # cookie. Leave empty to keep the zero-dependency cookie sessions.
+    #   pip install flask-session redis
+    SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "")
+
     # Audio temp storage
     UPLOAD_FOLDER = os.path.join(BASE_DIR, "static", "audio")
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+    # Scratch dir for uploaded voice clips — each one is written, transcribed
+    # and deleted within a single request, so prefer the RAM-backed tmpfs at
+    # /dev/shm where the OS provides one (Linux). Rendered TTS responses stay
+    # in UPLOAD_FOLDER because the client fetches them back by URL.
+    SCRATCH_FOLDER = "/dev/shm" if os.path.isdir("/dev/shm") else UPLOAD_FOLDER
+
     # Google OAuth
     GOOGLE_CLIENT_SECRETS_FILE = os.getenv(
         "GOOGLE_CLIENT_SECRETS_FILE",
@@ -28,6 +42,12 @@ class Config:
     ]
     OAUTHLIB_INSECURE_TRANSPORT = os.getenv("OAUTHLIB_INSECURE_TRANSPORT", "1")
 
+    # Client-side TTS: when true, voice endpoints return the text to speak
+    # instead of rendering a WAV server-side — the browser synthesizes it
+    # with the Web Speech API. Skips the whole pyttsx3 render + audio
+    # download per turn. Off by default (server audio keeps voices uniform).
+    CLIENT_TTS = os.getenv("CLIENT_TTS", "false").lower() == "true"
+
     # Whisper STT model
     # Options: tiny (~75MB), base (~145MB, recommended), small (~465MB), medium (~1.5GB)
     # Model is auto-downloaded to ~/.cache/whisper/ on first run.
@@ -5,40 +5,138 @@ Supports two auth flows:
   • Google OAuth  → uses Gmail REST API via googleapiclient
   • App Password  → uses IMAP / SMTP directly
 """
+import atexit
 import base64
 import imaplib
 import email as email_lib
 import smtplib
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from email.mime.text import MIMEText
 from email.header import decode_header
+from functools import lru_cache
 from html.parser import HTMLParser
 
 from googleapiclient.discovery import build
 
+# Optional — C-based HTML parsing for email bodies (order-of-magnitude
+# faster than the stdlib HTMLParser callbacks on marketing-style HTML):
+#   pip install selectolax
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 MAX_EMAILS = 10
 
+# ── Short-TTL fetch cache ──────────────────────────────────────────────────────
+# Repeated dashboard loads / voice commands within a few seconds otherwise
+# round-trip IMAP or the Gmail API for an unchanged inbox — the dominant
+# latency of those requests. Keyed per user+limit, kept in-process (same
+# pattern as _EMAIL_STORE in voice_processor), invalidated on send.
+# LRU-bounded like _EMAIL_STORE: expired entries are never swept, so an
+# unbounded dict would pin one inbox snapshot per (user, limit) pair seen
+# since startup.
+_FETCH_CACHE_TTL = 30  # seconds
+_FETCH_CACHE_MAX = 128
+_FETCH_CACHE: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+_FETCH_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(session: dict, limit: int) -> tuple:
+    user_data = session.get("user", {})
+    return (user_data.get("email", "anon"), limit)
+
+
+def invalidate_email_cache(session: dict) -> None:
+    """Drop all cached inbox snapshots for this user (called after a send)."""
+    user = session.get("user", {}).get("email", "anon")
+    with _FETCH_CACHE_LOCK:
+        for key in [k for k in _FETCH_CACHE if k[0] == user]:
+            _FETCH_CACHE.pop(key, None)
+
 
 # ── Public API ─────────────────────────────────────────────────────────────────
 def fetch_emails(session: dict, limit: int = MAX_EMAILS) -> list[dict]:
-    """Return the latest `limit` emails as a list of dicts."""
+    """Return the latest `limit` emails as a list of dicts (30 s TTL cache)."""
+    key = _cache_key(session, limit)
+    with _FETCH_CACHE_LOCK:
+        cached = _FETCH_CACHE.get(key)
+        if cached and cached[0] > time.monotonic():
+            _FETCH_CACHE.move_to_end(key)
+            return cached[1]
+        if cached:  # expired — drop rather than let it linger
+            _FETCH_CACHE.pop(key, None)
+
     user_data = session.get("user", {})
     auth_type = user_data.get("auth_type")
 
     if auth_type == "google":
-        return _fetch_gmail_api(session, limit)
+        emails = _fetch_gmail_api(session, limit)
     elif auth_type == "app_password":
-        return _fetch_imap(
+        emails = _fetch_imap(
             email_addr=user_data["email"],
             password=session.get("app_pass", ""),
             limit=limit,
         )
-    return []
+    else:
+        return []
+
+    if emails:  # don't cache transient failures
+        with _FETCH_CACHE_LOCK:
+            _FETCH_CACHE[key] = (time.monotonic() + _FETCH_CACHE_TTL, emails)
+            _FETCH_CACHE.move_to_end(key)
+            while len(_FETCH_CACHE) > _FETCH_CACHE_MAX:
+                _FETCH_CACHE.popitem(last=False)
+    return emails
+
+
+def fetch_email_body(session: dict, msg_id: str) -> str:
+    """
+    Fetch the full body of a single message on demand.
+
+    The list fetch is metadata-only (headers + snippet), so callers that
+    actually display or read a message aloud hydrate its body through here.
+    Returns an empty string on failure.
+    """
+    user_data = session.get("user", {})
+    auth_type = user_data.get("auth_type")
+    try:
+        if auth_type == "google":
+            service = _gmail_service(session)
+            msg_data = (
+                service.users()
+                .messages()
+                .get(
+                    userId="me", id=msg_id, format="full",
+                    fields="payload/mimeType,payload/headers,payload/parts,payload/body",
+                )
+                .execute()
+            )
+            return _extract_gmail_body(msg_data.get("payload", {}))
+        if auth_type == "app_password":
+            mail = None
+            try:
+                mail = _checkout_imap(user_data["email"], session.get("app_pass", ""))
+                mail.select("inbox")
+                _, msg_data = mail.fetch(msg_id, "(BODY.PEEK[])")
+            except Exception:
+                _discard_imap(mail)
+                raise
+            _checkin_imap(user_data["email"], mail)
+            for item in msg_data:
+                if isinstance(item, tuple) and len(item) == 2:
+                    return _get_body(email_lib.message_from_bytes(item[1]))
+    except Exception as exc:
+        logger.error("Body fetch error for message %s: %s", msg_id, exc)
+    return ""
 
 
 def send_email(session: dict, to_addr: str, subject: str, body: str) -> tuple[bool, str]:
@@ -47,24 +145,61 @@ def send_email(session: dict, to_addr: str, subject: str, body: str) -> tuple[bo
     auth_type = user_data.get("auth_type")
 
     if auth_type == "google":
-        return _send_gmail_api(session, to_addr, subject, body)
+        success, message = _send_gmail_api(session, to_addr, subject, body)
     elif auth_type == "app_password":
-        return _send_smtp(
+        success, message = _send_smtp(
             from_addr=user_data["email"],
             password=session.get("app_pass", ""),
             to_addr=to_addr,
             subject=subject,
             body=body,
         )
-    return False, "Unknown auth type"
+    else:
+        return False, "Unknown auth type"
+
+    if success:
+        # A sent message may appear in the inbox (self-sends, Gmail threads)
+        # — drop the cached snapshot so the next fetch sees it.
+        invalidate_email_cache(session)
+    return success, message
 
 
 # ── Gmail API (OAuth) ──────────────────────────────────────────────────────────
+# Rebuilding the service per call reparses the discovery document and opens a
+# fresh HTTP client each time. Cache one service per user so repeated fetches
+# and sends reuse the same keep-alive connection pool; the underlying
+# AuthorizedHttp refreshes expired tokens on its own, so a cached service
+# stays valid across token rotations.
+_SERVICE_CACHE_TTL = 300  # seconds
+_SERVICE_CACHE: dict[str, tuple[float, object]] = {}
+_SERVICE_LOCK = threading.Lock()
+
+
+def invalidate_gmail_service(session: dict) -> None:
+    """Drop the cached Gmail service for this user (called on logout)."""
+    user = session.get("user", {}).get("email", "anon")
+    with _SERVICE_LOCK:
+        _SERVICE_CACHE.pop(user, None)
+
+
 def _gmail_service(session: dict):
     from auth.google_auth import GoogleUser
+    key = session.get("user", {}).get("email", "anon")
+    now = time.monotonic()
+    with _SERVICE_LOCK:
+        cached = _SERVICE_CACHE.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
     user = GoogleUser.from_session(session["user"])
     creds = user.get_credentials()
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    service = build(
+        "gmail", "v1", credentials=creds,
+        cache_discovery=False, static_discovery=True,
+    )
+    with _SERVICE_LOCK:
+        _SERVICE_CACHE[key] = (now + _SERVICE_CACHE_TTL, service)
+    return service
 
 
 def _fetch_gmail_api(session: dict, limit: int = MAX_EMAILS) -> list[dict]:
@@ -77,26 +212,52 @@ def _fetch_gmail_api(session: dict, limit: int = MAX_EMAILS) -> list[dict]:
             .execute()
         )
         messages = result.get("messages", [])
-        emails = []
+        if not messages:
+            return []
+
+        # One .get() per message means N serial HTTPS round-trips; a batch
+        # request fetches all of them in a single multipart call. The list
+        # view only needs headers + snippet, so format="metadata" avoids
+        # downloading full MIME trees (often 50-500 KB each) — the body is
+        # hydrated lazily via fetch_email_body when someone opens/reads one.
+        by_id: dict[str, dict] = {}
+
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                logger.error("Gmail batch get failed for %s: %s", request_id, exception)
+            else:
+                by_id[request_id] = response
+
+        batch = service.new_batch_http_request(callback=_collect)
         for msg in messages:
-            msg_data = (
-                service.users()
-                .messages()
-                .get(userId="me", id=msg["id"], format="full")
-                .execute()
+            batch.add(
+                service.users().messages().get(
+                    userId="me",
+                    id=msg["id"],
+                    format="metadata",
+                    metadataHeaders=["From", "Subject", "Date"],
+                    fields="id,snippet,payload/headers",
+                ),
+                request_id=msg["id"],
             )
+        batch.execute()
+
+        emails = []
+        for msg in messages:  # preserve list order — newest first
+            msg_data = by_id.get(msg["id"])
+            if msg_data is None:
+                continue
             headers = {
                 h["name"]: h["value"]
                 for h in msg_data.get("payload", {}).get("headers", [])
             }
-            body = _extract_gmail_body(msg_data.get("payload", {}))
             emails.append({
                 "id": msg["id"],
                 "from": headers.get("From", "Unknown"),
                 "subject": headers.get("Subject", "(No subject)"),
                 "date": headers.get("Date", ""),
-                "body": body,
-                "snippet": body[:200] if body else msg_data.get("snippet", ""),
+                "body": "",
+                "snippet": msg_data.get("snippet", ""),
             })
         return emails
     except Exception as exc:
@@ -104,6 +265,11 @@ def _fetch_gmail_api(session: dict, limit: int = MAX_EMAILS) -> list[dict]:
         return []
 
 
+def _b64_decode(data: str) -> bytes:
+    """urlsafe-base64 decode with exact padding (blind '+\"==\"' overpads)."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
 def _extract_gmail_body(payload: dict) -> str:
     """Recursively extract plain-text body from a Gmail API payload part."""
     mime = payload.get("mimeType", "")
@@ -112,27 +278,30 @@ def _extract_gmail_body(payload: dict) -> str:
     if mime == "text/plain":
         data = payload.get("body", {}).get("data", "")
         if data:
-            return base64.urlsafe_b64decode(data + "==").decode("utf-8", errors="replace")
+            return _b64_decode(data).decode("utf-8", errors="replace")
 
     if mime == "text/html":
         data = payload.get("body", {}).get("data", "")
         if data:
-            html = base64.urlsafe_b64decode(data + "==").decode("utf-8", errors="replace")
+            html = _b64_decode(data).decode("utf-8", errors="replace")
             return _html_to_text(html)
 
-    # Recurse into multipart
+    # Recurse into multipart — stop at the first plain-text hit instead of
+    # decoding every remaining sibling part
     plain = ""
     html_fallback = ""
     for part in parts:
         t = part.get("mimeType", "")
         if t == "text/plain":
             plain = _extract_gmail_body(part)
-        elif t == "text/html":
+        elif t == "text/html" and not html_fallback:
             html_fallback = _extract_gmail_body(part)
         elif t.startswith("multipart/"):
             result = _extract_gmail_body(part)
             if result:
                 plain = result
+        if plain:
+            break
     return plain or html_fallback
 
 
@@ -153,7 +322,63 @@ def _send_gmail_api(session: dict, to_addr: str, subject: str, body: str) -> tup
 
 
 # ── IMAP (App Password) ────────────────────────────────────────────────────────
+# Connection pool: a fresh IMAP4_SSL per fetch costs a TLS handshake plus
+# CAPABILITY/LOGIN round-trips (~300-800 ms) before any real work. Keep one
+# authenticated connection per user and hand it back after use; checkout pops
+# the entry so two concurrent requests never share a socket (the second one
+# simply opens its own).
+_IMAP_IDLE_S = 240  # server-side timeouts are typically ~5 min — stay under
+_imap_pool: dict[str, tuple[imaplib.IMAP4_SSL, float]] = {}
+_imap_lock = threading.Lock()
+
+
+def _checkout_imap(email_addr: str, password: str) -> imaplib.IMAP4_SSL:
+    with _imap_lock:
+        entry = _imap_pool.pop(email_addr, None)
+    if entry is not None:
+        conn, last_used = entry
+        if time.monotonic() - last_used < _IMAP_IDLE_S:
+            try:
+                conn.noop()
+                return conn
+            except Exception:
+                pass  # stale — fall through and reconnect
+        _discard_imap(conn)
+    conn = imaplib.IMAP4_SSL(Config.GMAIL_IMAP_HOST)
+    conn.login(email_addr, password)
+    return conn
+
+
+def _checkin_imap(email_addr: str, conn: imaplib.IMAP4_SSL) -> None:
+    with _imap_lock:
+        old = _imap_pool.get(email_addr)
+        _imap_pool[email_addr] = (conn, time.monotonic())
+    if old is not None and old[0] is not conn:
+        _discard_imap(old[0])
+
+
+def _discard_imap(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.logout()
+    except Exception:
+        pass
+
+
+@atexit.register
+def _close_imap_pool() -> None:
+    with _imap_lock:
+        conns = [conn for conn, _ in _imap_pool.values()]
+        _imap_pool.clear()
+    for conn in conns:
+        _discard_imap(conn)
+
+
+@lru_cache(maxsize=1024)
 def _decode_header_value(value: str) -> str:
+    # Cached: newsletters/threads repeat identical From and Subject headers
+    # across many messages, and RFC 2047 decoding is pure per-value work.
     decoded, encoding = decode_header(value)[0]
     if isinstance(decoded, bytes):
         return decoded.decode(encoding or "utf-8", errors="replace")
@@ -161,9 +386,11 @@ def _decode_header_value(value: str) -> str:
 
 
 def _fetch_imap(email_addr: str, password: str, limit: int = MAX_EMAILS) -> list[dict]:
+    mail = None
     try:
-        mail = imaplib.IMAP4_SSL(Config.GMAIL_IMAP_HOST)
-        mail.login(email_addr, password)
+        mail = _checkout_imap(email_addr, password)
+        # Re-SELECT on every fetch — sequence numbers shift as the mailbox
+        # changes, and it's a single round-trip on the pooled connection.
         mail.select("inbox")
 
         _, data = mail.search(None, "ALL")
@@ -172,50 +399,77 @@ def _fetch_imap(email_addr: str, password: str, limit: int = MAX_EMAILS) -> list
         latest_ids = list(reversed(latest_ids))  # newest first
 
         emails = []
-        for eid in latest_ids:
-            _, msg_data = mail.fetch(eid, "(RFC822)")
-            raw = msg_data[0][1]
-            msg = email_lib.message_from_bytes(raw)
-            body = _get_body(msg)
-            emails.append({
-                "id": eid.decode(),
-                "from": _decode_header_value(msg.get("From", "Unknown")),
-                "subject": _decode_header_value(msg.get("Subject", "(No subject)")),
-                "date": msg.get("Date", ""),
-                "body": body,
-                "snippet": body[:200] if body else "",
-            })
-
-        mail.logout()
+        if latest_ids:
+            # One FETCH with a comma-joined id set instead of N sequential
+            # round-trips over the SSL socket; BODY.PEEK[] also avoids
+            # marking everything \Seen the way RFC822 does.
+            id_set = b",".join(latest_ids).decode()
+            _, msg_data = mail.fetch(id_set, "(BODY.PEEK[])")
+
+            # Literal responses come back as (b'<id> (BODY[] {n}', raw) pairs
+            # in server order — index them by id so we keep newest-first.
+            raw_by_id: dict[bytes, bytes] = {}
+            for item in msg_data:
+                if isinstance(item, tuple) and len(item) == 2 and item[0]:
+                    raw_by_id[item[0].split()[0]] = item[1]
+
+            for eid in latest_ids:
+                raw = raw_by_id.get(eid)
+                if raw is None:
+                    continue
+                msg = email_lib.message_from_bytes(raw)
+                body = _get_body(msg)
+                emails.append({
+                    "id": eid.decode(),
+                    "from": _decode_header_value(msg.get("From", "Unknown")),
+                    "subject": _decode_header_value(msg.get("Subject", "(No subject)")),
+                    "date": msg.get("Date", ""),
+                    "body": body,
+                    "snippet": body[:200] if body else "",
+                })
+
+        _checkin_imap(email_addr, mail)
         return emails
 
     except Exception as exc:
         logger.error("IMAP fetch error: %s", exc)
+        _discard_imap(mail)
         return []
 
 
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
 class _HTMLStripper(HTMLParser):
-    """Minimal HTML → plain text converter."""
+    """Minimal HTML → plain text converter (stdlib fallback)."""
     def __init__(self):
         super().__init__()
         self._parts = []
     def handle_data(self, data):
         self._parts.append(data)
     def get_text(self):
-        return re.sub(r'\n{3,}', '\n\n', "\n".join(
+        return _BLANK_LINES_RE.sub('\n\n', "\n".join(
             p.strip() for p in self._parts if p.strip()
         ))
 
 
 def _html_to_text(html: str) -> str:
     """Strip HTML tags and return readable plain text."""
+    if _SelectolaxParser is not None:
+        try:
+            body = _SelectolaxParser(html).body
+            if body is not None:
+                return _BLANK_LINES_RE.sub('\n\n', body.text(separator='\n')).strip()
+        except Exception:
+            pass  # fall through to the stdlib stripper
     try:
         stripper = _HTMLStripper()
         stripper.feed(html)
         return stripper.get_text()
     except Exception:
         # Fallback: crude regex strip
-        return re.sub(r'<[^>]+>', ' ', html).strip()
+        return _TAG_RE.sub(' ', html).strip()
 
 
 def _get_body(msg) -> str:
@@ -247,10 +501,64 @@ def _get_body(msg) -> str:
     if html:
         return _html_to_text(html)
     return "(No message body)"
-    return ""
 
 
 # ── SMTP (App Password) ────────────────────────────────────────────────────────
+# Same pooling rationale as IMAP above: a fresh connection pays TCP +
+# STARTTLS + EHLO + AUTH round-trips before the MAIL transaction, which
+# dominates the confirm step of a compose. Keep one authenticated connection
+# per user between sends; checkout pops the entry so two concurrent sends
+# never share a socket.
+_SMTP_IDLE_S = 240
+_smtp_pool: dict[str, tuple[smtplib.SMTP, float]] = {}
+_smtp_lock = threading.Lock()
+
+
+def _checkout_smtp(from_addr: str, password: str) -> smtplib.SMTP:
+    with _smtp_lock:
+        entry = _smtp_pool.pop(from_addr, None)
+    if entry is not None:
+        conn, last_used = entry
+        if time.monotonic() - last_used < _SMTP_IDLE_S:
+            try:
+                conn.noop()
+                return conn
+            except Exception:
+                pass  # stale — fall through and reconnect
+        _discard_smtp(conn)
+    conn = smtplib.SMTP(Config.GMAIL_SMTP_HOST, Config.GMAIL_SMTP_PORT)
+    conn.ehlo()
+    conn.starttls()
+    conn.login(from_addr, password)
+    return conn
+
+
+def _checkin_smtp(from_addr: str, conn: smtplib.SMTP) -> None:
+    with _smtp_lock:
+        old = _smtp_pool.get(from_addr)
+        _smtp_pool[from_addr] = (conn, time.monotonic())
+    if old is not None and old[0] is not conn:
+        _discard_smtp(old[0])
+
+
+def _discard_smtp(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.quit()
+    except Exception:
+        pass
+
+
+@atexit.register
+def _close_smtp_pool() -> None:
+    with _smtp_lock:
+        conns = [conn for conn, _ in _smtp_pool.values()]
+        _smtp_pool.clear()
+    for conn in conns:
+        _discard_smtp(conn)
+
+
 def _send_smtp(
     from_addr: str, password: str, to_addr: str, subject: str, body: str
 ) -> tuple[bool, str]:
@@ -260,11 +568,13 @@ def _send_smtp(
         msg["To"] = to_addr
         msg["Subject"] = subject
 
-        with smtplib.SMTP(Config.GMAIL_SMTP_HOST, Config.GMAIL_SMTP_PORT) as server:
-            server.ehlo()
-            server.starttls()
-            server.login(from_addr, password)
+        server = _checkout_smtp(from_addr, password)
+        try:
             server.sendmail(from_addr, to_addr, msg.as_string())
+        except Exception:
+            _discard_smtp(server)
+            raise
+        _checkin_smtp(from_addr, server)
 
         return True, "Email sent successfully"
     except smtplib.SMTPAuthenticationError:
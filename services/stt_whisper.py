@@ -15,27 +15,111 @@ Model size guide
   medium ~1.5 GB  – near-perfect, needs GPU for real-time use
 
 Set WHISPER_MODEL=base in your .env file (default: base).
+
+If `faster-whisper` is installed (optional), the same model name is loaded
+through CTranslate2 with int8 quantization instead — roughly 3x faster
+decoding on CPU for near-identical accuracy. No configuration change needed;
+the backend is picked automatically at import.
 """
+import hashlib
+import io
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
 import numpy as np
 import soundfile as sf
 import whisper
 
+# Optional — CTranslate2 int8 backend (~3x faster decode on CPU, same models):
+#   pip install faster-whisper
+try:
+    from faster_whisper import WhisperModel as _FasterWhisperModel
+except ImportError:
+    _FasterWhisperModel = None
+
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# ── Transcription result cache ────────────────────────────────────────────────
+# Retried logins replay the identical recording; hashing the WAV bytes turns a
+# repeat inference run (100s of ms) into a dict lookup. Small + short-lived:
+# audio rarely repeats outside the retry window.
+_CACHE_TTL     = 300   # seconds
+_CACHE_MAX     = 32    # entries
+_result_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+# The server is threaded — without a lock, a concurrent eviction can remove
+# the key between _cache_get's get() and move_to_end(), raising KeyError.
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple) -> str | None:
+    with _cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        expires, text = entry
+        if expires < time.monotonic():
+            _result_cache.pop(key, None)
+            return None
+        _result_cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key: tuple, text: str) -> None:
+    with _cache_lock:
+        _result_cache[key] = (time.monotonic() + _CACHE_TTL, text)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _CACHE_MAX:
+            _result_cache.popitem(last=False)
+
 # ── Load model once (module-level singleton) ──────────────────────────────────
 _model_name: str = Config.WHISPER_MODEL
 _model = None
 
-try:
-    logger.info("Loading Whisper '%s' model …", _model_name)
-    _model = whisper.load_model(_model_name)
-    logger.info("Whisper '%s' model loaded successfully.", _model_name)
-except Exception as exc:
-    _model = None
-    logger.error("Failed to load Whisper model '%s': %s", _model_name, exc)
+# Whisper inference saturates all cores via its BLAS backend and the model is
+# not thread-safe; under a threaded server, concurrent requests running it in
+# parallel just fight for the same cores and all finish slower. Serialize
+# inference so bursts queue up instead of thrashing.
+_model_lock = threading.Lock()
+
+# "openai" (whisper.load_model) or "ct2" (faster-whisper, int8-quantized)
+_backend = "openai"
+
+# The weights load in a background thread so importing this module (and
+# therefore booting Flask) doesn't block for the seconds the load takes.
+# transcribe() waits on the event the first time it is called.
+_model_ready = threading.Event()
+
+
+def _load_model() -> None:
+    global _model, _backend
+    try:
+        if _FasterWhisperModel is not None:
+            logger.info("Loading faster-whisper '%s' model (int8) …", _model_name)
+            _model = _FasterWhisperModel(_model_name, device="cpu", compute_type="int8")
+            _backend = "ct2"
+            logger.info("faster-whisper '%s' model loaded successfully.", _model_name)
+        else:
+            logger.info("Loading Whisper '%s' model …", _model_name)
+            _model = whisper.load_model(_model_name)
+            logger.info("Whisper '%s' model loaded successfully.", _model_name)
+    except Exception as exc:
+        _model = None
+        logger.error("Failed to load Whisper model '%s': %s", _model_name, exc)
+    finally:
+        _model_ready.set()
+
+
+threading.Thread(target=_load_model, name="whisper-load", daemon=True).start()
+
+
+def load_failed() -> bool:
+    """True when the background model load has finished and failed."""
+    return _model_ready.is_set() and _model is None
 
 
 # ── Prompt — guides Whisper toward email + Telegram command vocabulary ──────────
@@ -49,6 +133,56 @@ _PROMPT = (
 )
 
 
+def warm_up() -> None:
+    """
+    Run one short throwaway inference so the first real request doesn't pay
+    for lazy kernel/thread-pool initialisation inside the backend. The model
+    weights themselves already load at import; this warms the compute path.
+    Safe to call from a background thread at server start.
+    """
+    if not _model_ready.wait(timeout=300) or _model is None:
+        return
+    try:
+        # Low-level noise (not pure silence) so _trim_silence-style gating in
+        # the backend doesn't skip the decode entirely.
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(16000) * 1e-3).astype(np.float32)
+        with _model_lock:
+            if _backend == "ct2":
+                segments, _info = _model.transcribe(audio, language="en", beam_size=1)
+                list(segments)  # generator — drain to actually run the decode
+            else:
+                _model.transcribe(
+                    audio, language="en", fp16=False,
+                    temperature=0.0, beam_size=1, best_of=1,
+                )
+        logger.info("Whisper warm-up inference complete.")
+    except Exception as exc:
+        logger.warning("Whisper warm-up failed: %s", exc)
+
+
+def _resample_16k(audio: np.ndarray, sr: int) -> np.ndarray:
+    """
+    Resample `audio` to 16 kHz. Uses scipy's polyphase FIR resampler (C
+    implementation with proper anti-aliasing) when scipy is installed;
+    otherwise falls back to linear interpolation, which is fine for the
+    speech band but allocates temporary float64 arrays.
+    """
+    try:
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        g = gcd(16000, sr)
+        return resample_poly(audio, 16000 // g, sr // g).astype(np.float32)
+    except ImportError:
+        target_len = int(len(audio) * 16000 / sr)
+        return np.interp(
+            np.linspace(0, len(audio) - 1, target_len),
+            np.arange(len(audio)),
+            audio,
+        ).astype(np.float32)
+
+
 def _trim_silence(
     audio: np.ndarray,
     sr: int,
@@ -91,33 +225,52 @@ def _trim_silence(
     return audio[start:end]
 
 
-def transcribe(wav_path: str, language: str = "en") -> str:
+def transcribe(wav_source, language: str = "en") -> str:
     """
-    Transcribe a 16 kHz mono WAV file and return the recognised text.
+    Transcribe a 16 kHz mono WAV and return the recognised text.
+    `wav_source` is a file path or a seekable file-like object (e.g. the
+    upload stream) — passing the stream directly skips the temp-file
+    round-trip on the hot login path.
     `language` is the BCP-47 code (e.g. "en", "hi", "mr") passed to Whisper
     so it focuses on the right language and alphabet.
     Returns an empty string on failure.
     """
-    if _model is None:
+    # First call may arrive while the background load is still running —
+    # block until it finishes (or give up if it never does).
+    if not _model_ready.wait(timeout=60) or _model is None:
         logger.error("Whisper model not loaded — cannot transcribe")
         return ""
 
     try:
-        # Load audio — soundfile handles .wav without requiring ffmpeg
-        audio, sr = sf.read(wav_path, dtype="float32")
+        # Read raw bytes once so we can hash them for the result cache;
+        # a retried upload of the same clip then skips inference entirely.
+        if isinstance(wav_source, (str, os.PathLike)):
+            with open(wav_source, "rb") as f:
+                raw = f.read()
+        else:
+            raw = wav_source.read()
+
+        key = (hashlib.sha1(raw).hexdigest(), language)
+        cached = _cache_get(key)
+        if cached is not None:
+            logger.info("Whisper transcription (cached): %r", cached)
+            return cached
 
-        # Mix stereo → mono if needed
+        # Load audio — soundfile handles paths and file-likes without ffmpeg
+        audio, sr = sf.read(io.BytesIO(raw), dtype="float32")
+
+        # Mix stereo → mono if needed. Explicit add+scale keeps everything in
+        # float32 SIMD ufuncs; mean(axis=1) accumulates in float64 and divides
+        # per sample.
         if audio.ndim > 1:
-            audio = audio.mean(axis=1)
+            if audio.shape[1] == 2:
+                audio = np.add(audio[:, 0], audio[:, 1], dtype=np.float32) * np.float32(0.5)
+            else:
+                audio = np.add.reduce(audio, axis=1, dtype=np.float32) * np.float32(1.0 / audio.shape[1])
 
         # Browser sends 16 kHz already.  Guard for edge cases with other rates.
         if sr != 16000:
-            target_len = int(len(audio) * 16000 / sr)
-            audio = np.interp(
-                np.linspace(0, len(audio) - 1, target_len),
-                np.arange(len(audio)),
-                audio,
-            ).astype(np.float32)
+            audio = _resample_16k(audio, sr)
 
         # ── Silence trim: strip leading/trailing quiet (< 1 % of peak RMS) ──
         # This prevents Whisper from wasting time on empty frames and dramatically
@@ -127,26 +280,42 @@ def transcribe(wav_path: str, language: str = "en") -> str:
         # Return immediately if the entire clip is silence
         if len(audio) < 1600:   # < 0.1 s of speech — nothing useful
             logger.info("Audio is silence — skipping transcription.")
+            _cache_put(key, "")
             return ""
 
-        result = _model.transcribe(
-            audio,
-            language=language,
-            fp16=False,                       # False for CPU; True speeds up GPU
-            initial_prompt=_PROMPT,
-            temperature=0.0,                  # greedy decoding — fastest & deterministic
-            beam_size=1,                      # greedy beam — eliminates 5× overhead
-            best_of=1,                        # no candidate sampling needed at temp=0
-            condition_on_previous_text=False,
-            no_speech_threshold=0.6,          # skip if Whisper is confident it's silence
-            compression_ratio_threshold=2.4,  # skip repetitive / garbage output
-        )
-
-        text = result.get("text", "").strip()
+        with _model_lock:
+            if _backend == "ct2":
+                segments, _info = _model.transcribe(
+                    audio,
+                    language=language,
+                    initial_prompt=_PROMPT,
+                    temperature=0.0,
+                    beam_size=1,
+                    best_of=1,
+                    condition_on_previous_text=False,
+                    no_speech_threshold=0.6,
+                    vad_filter=True,  # skip silent spans mid-clip, not just edges
+                )
+                text = " ".join(seg.text.strip() for seg in segments).strip()
+            else:
+                result = _model.transcribe(
+                    audio,
+                    language=language,
+                    fp16=False,                       # False for CPU; True speeds up GPU
+                    initial_prompt=_PROMPT,
+                    temperature=0.0,                  # greedy decoding — fastest & deterministic
+                    beam_size=1,                      # greedy beam — eliminates 5× overhead
+                    best_of=1,                        # no candidate sampling needed at temp=0
+                    condition_on_previous_text=False,
+                    no_speech_threshold=0.6,          # skip if Whisper is confident it's silence
+                    compression_ratio_threshold=2.4,  # skip repetitive / garbage output
+                )
+                text = result.get("text", "").strip()
+        _cache_put(key, text)
         logger.info("Whisper transcription: %r", text)
         return text
 
     except Exception as exc:
-        logger.error("Whisper transcription error for %s: %s", wav_path, exc)
+        logger.error("Whisper transcription error for %s: %s", wav_source, exc)
         return ""
 
@@ -1,8 +1,9 @@
 """
 Offline Text-to-Speech using pyttsx3.
 
-pyttsx3 engines are NOT thread-safe; we reinitialise per call to avoid
-issues when Flask handles concurrent requests.
+pyttsx3 engines are NOT thread-safe, but they are reusable within a thread —
+so we keep one initialised engine per thread (threading.local) instead of
+paying pyttsx3.init() + the SAPI voice scan for every chunk.
 
 pyttsx3 on Windows (SAPI5) silently truncates save_to_file output when the
 text is long. Fix: split into sentence-level chunks, generate one WAV per
@@ -11,8 +12,11 @@ chunk, then stitch the raw PCM together into a single file.
 import os
 import re
 import struct
-import uuid
+import threading
+import wave
 import logging
+from concurrent.futures import ProcessPoolExecutor
+
 import pyttsx3
 from config import Config
 
@@ -21,6 +25,12 @@ logger = logging.getLogger(__name__)
 # Characters per chunk sent to pyttsx3 — keeps each WAV well within SAPI limits
 _TTS_CHUNK_CHARS = 180
 
+# Compiled once — these run on every chunk of every TTS call
+_SENT_RE    = re.compile(r'(?<=[.!?])\s+')
+_SUBSENT_RE = re.compile(r'(?<=[,;:])\s+')
+_TAG_RE     = re.compile(r'<[^>]*>')
+_WS_RE      = re.compile(r'\s+')
+
 
 def _split_sentences(text: str) -> list[str]:
     """
@@ -28,13 +38,13 @@ def _split_sentences(text: str) -> list[str]:
     Falls back to splitting on commas / colons if a sentence is still too long.
     """
     # Split on .  !  ?  followed by space or end-of-string
-    raw = re.split(r'(?<=[.!?])\s+', text.strip())
+    raw = _SENT_RE.split(text.strip())
     chunks = []
     buf = ""
     for sent in raw:
         # If a single sentence is already too long, split further on , ; :
         if len(sent) > _TTS_CHUNK_CHARS:
-            sub_parts = re.split(r'(?<=[,;:])\s+', sent)
+            sub_parts = _SUBSENT_RE.split(sent)
             for sub in sub_parts:
                 if len(buf) + len(sub) + 1 > _TTS_CHUNK_CHARS and buf:
                     chunks.append(buf.strip())
@@ -52,29 +62,107 @@ def _split_sentences(text: str) -> list[str]:
     return [c for c in chunks if c]
 
 
+# Voice choice is a property of the installed drivers, not of the engine
+# instance — scan once and reuse the id, so only the first engine init pays
+# the getProperty("voices") enumeration.
+_voice_id: str | None = None
+_voice_scanned = False
+
+
 def _make_engine():
+    global _voice_id, _voice_scanned
     engine = pyttsx3.init()
     engine.setProperty("rate", 165)
     engine.setProperty("volume", 0.95)
-    voices = engine.getProperty("voices")
-    for voice in voices:
-        if "female" in voice.name.lower() or "zira" in voice.name.lower():
-            engine.setProperty("voice", voice.id)
-            break
+    if not _voice_scanned:
+        for voice in engine.getProperty("voices"):
+            if "female" in voice.name.lower() or "zira" in voice.name.lower():
+                _voice_id = voice.id
+                break
+        _voice_scanned = True
+    if _voice_id:
+        engine.setProperty("voice", _voice_id)
+    return engine
+
+
+_tls = threading.local()
+
+
+def _get_engine():
+    """Return this thread's cached engine, initialising it on first use."""
+    engine = getattr(_tls, "engine", None)
+    if engine is None:
+        engine = _make_engine()
+        _tls.engine = engine
     return engine
 
 
+def _drop_engine():
+    """Discard this thread's engine so the next call rebuilds it."""
+    _tls.engine = None
+
+
+# ── Parallel chunk rendering ──────────────────────────────────────────────────
+# pyttsx3 isn't thread-safe but is process-safe, so long texts render their
+# chunks across a small process pool. Only worth it past a few chunks — for
+# short prompts the pool dispatch costs more than the serial render.
+_PARALLEL_MIN_CHUNKS = 3
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_chunk(text: str, path: str) -> None:
+    """Worker-process entry point: render one chunk with its own engine."""
+    engine = _make_engine()
+    engine.save_to_file(text, path)
+    engine.runAndWait()
+    engine.stop()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        return _pool
+
+
+# ── Canned-response cache ─────────────────────────────────────────────────────
+# Fixed prompts (help text, compose questions, stop/cancel confirmations…)
+# are spoken verbatim every session. Remember the rendered file per exact
+# text so those turns skip pyttsx3 entirely. Long texts (email bodies) are
+# unique per turn and would only churn the cache, so only short texts
+# participate. Entries revalidate with os.path.exists in case the file was
+# cleaned up underneath us.
+_CACHE_MAX_CHARS   = 250
+_CACHE_MAX_ENTRIES = 64
+_render_cache: dict[str, str] = {}
+_render_cache_lock = threading.Lock()
+
+
 def _read_wav_data(path: str) -> tuple[dict, bytes]:
     """Read a WAV file and return (header_params, raw_pcm_bytes)."""
+    try:
+        # wave walks the RIFF chunk chain properly (LIST/INFO chunks before
+        # fmt don't confuse it) and reads only the PCM frames.
+        with wave.open(path, "rb") as wf:
+            params = {
+                "channels":    wf.getnchannels(),
+                "sample_rate": wf.getframerate(),
+                "bit_depth":   wf.getsampwidth() * 8,
+            }
+            return params, wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError):
+        pass
+
+    # Fallback: linear scan for the fmt/data chunks (non-PCM or odd headers)
     with open(path, "rb") as f:
         data = f.read()
-    # Find 'data' chunk
     idx = data.find(b'data')
     if idx == -1:
         return {}, b""
     pcm_size = struct.unpack_from("<I", data, idx + 4)[0]
     pcm = data[idx + 8 : idx + 8 + pcm_size]
-    # Parse fmt chunk
     fmt_idx = data.find(b'fmt ')
     params = {}
     if fmt_idx != -1:
@@ -111,35 +199,66 @@ def speak_to_file(text: str) -> str:
 
     # ── Safety: strip SSML/XML angle-bracket tags before they reach SAPI5 ────
     # SAPI5 treats < > as SSML markup; a malformed tag silently aborts all audio.
-    text = re.sub(r'<[^>]*>', ' ', text)          # remove <tag> blocks
+    text = _TAG_RE.sub(' ', text)                    # remove <tag> blocks
     text = text.replace('<', ' ').replace('>', ' ')  # kill any strays
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
+
+    cacheable = len(text) <= _CACHE_MAX_CHARS
+    if cacheable:
+        with _render_cache_lock:
+            cached = _render_cache.get(text)
+        if cached and os.path.exists(cached):
+            return cached
 
     chunks   = _split_sentences(text)
     tmp_dir  = Config.UPLOAD_FOLDER
-    out_path = os.path.join(tmp_dir, f"tts_{uuid.uuid4().hex}.wav")
+    out_path = os.path.join(tmp_dir, f"tts_{os.urandom(8).hex()}.wav")
     tmp_paths: list[str] = []
 
     try:
-        for chunk in chunks:
-            tmp = os.path.join(tmp_dir, f"_tts_chunk_{uuid.uuid4().hex}.wav")
-            tmp_paths.append(tmp)
-            engine = _make_engine()
-            engine.save_to_file(chunk, tmp)
-            engine.runAndWait()
-            engine.stop()
+        parallel = len(chunks) >= _PARALLEL_MIN_CHUNKS
+        if parallel:
+            try:
+                tmp_paths = [
+                    os.path.join(tmp_dir, f"_tts_chunk_{os.urandom(8).hex()}.wav")
+                    for _ in chunks
+                ]
+                pool = _get_pool()
+                futures = [
+                    pool.submit(_render_chunk, chunk, tmp)
+                    for chunk, tmp in zip(chunks, tmp_paths)
+                ]
+                for fut in futures:
+                    fut.result()
+            except Exception as exc:
+                logger.warning("Parallel TTS failed (%s) — rendering serially", exc)
+                parallel = False
+                tmp_paths = []
+
+        if not parallel:
+            # Reuse this thread's engine across chunks — runAndWait() returns
+            # after each save, leaving the engine ready for the next one.
+            engine = _get_engine()
+            for chunk in chunks:
+                tmp = os.path.join(tmp_dir, f"_tts_chunk_{os.urandom(8).hex()}.wav")
+                tmp_paths.append(tmp)
+                engine.save_to_file(chunk, tmp)
+                engine.runAndWait()
 
         # ── Stitch all chunk WAVs into one file ───────────────────────────────
-        all_pcm    = b""
+        # Collect parts and join once — bytes += in a loop re-copies the
+        # accumulated PCM every iteration (quadratic in total audio size).
+        pcm_parts: list[bytes] = []
         wav_params = {}
         for tp in tmp_paths:
             if not os.path.exists(tp) or os.path.getsize(tp) == 0:
                 continue
             params, pcm = _read_wav_data(tp)
             if pcm:
-                all_pcm += pcm
+                pcm_parts.append(pcm)
                 if not wav_params:
                     wav_params = params
+        all_pcm = b"".join(pcm_parts)
 
         if not all_pcm or not wav_params:
             logger.error("TTS produced no audio data")
@@ -152,10 +271,16 @@ def speak_to_file(text: str) -> str:
             wav_params.get("bit_depth",   16),
         )
         logger.info("TTS saved to %s (%d bytes, %d chunks)", out_path, len(all_pcm), len(tmp_paths))
+        if cacheable:
+            with _render_cache_lock:
+                if len(_render_cache) >= _CACHE_MAX_ENTRIES:
+                    _render_cache.pop(next(iter(_render_cache)))
+                _render_cache[text] = out_path
         return out_path
 
     except Exception as exc:
         logger.error("TTS error: %s", exc)
+        _drop_engine()  # engine state is suspect — rebuild on next call
         return ""
 
     finally:
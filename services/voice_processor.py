@@ -11,19 +11,34 @@ Pipeline:
 """
 import os
 import re
-import uuid
+import shutil
 import logging
 import difflib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from werkzeug.datastructures import FileStorage
 
-from services.stt_whisper import transcribe, _model as _whisper_model
+# Optional C-accelerated fuzzy matching (pip install rapidfuzz). difflib's
+# pure-Python SequenceMatcher remains the fallback.
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process
+except ImportError:
+    _rf_fuzz = _rf_process = None
+
+from services.stt_whisper import transcribe, load_failed as _whisper_load_failed
 from services.tts_engine import speak_to_file
-from services.email_service import fetch_emails, send_email
+from services.email_service import fetch_emails, fetch_email_body, send_email
 from services.messaging_service import send_message as tg_send, read_latest_message as tg_read, get_all_messages as tg_all
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# TTS renders on a small pool so the request thread can overlap it with the
+# input-file cleanup instead of running the two strictly back to back.
+_TTS_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts")
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Intent keyword tables
 # Each list contains the canonical word PLUS every common Whisper mis-transcription
@@ -165,6 +180,68 @@ _INTENTS = {
     ],
 }
 
+# ── Precomputed single-pass keyword scanner ──────────────────────────────────
+# The standard intent loop used to run a separate substring test for every
+# keyword of every intent (~100 `in` checks per utterance). One compiled
+# alternation now scans the utterance once and reports every keyword present;
+# the loop then just intersects against that hit set. _INTENTS dict order
+# still decides priority and the service filter still applies unchanged.
+_INTENT_KW_SETS: dict[str, frozenset] = {
+    intent: frozenset(kws) for intent, kws in _INTENTS.items()
+}
+
+# Flat keyword view for the vectorized fuzzy fallback: one similarity matrix
+# scores every token against every keyword, so its columns need to map back
+# to an intent — and to that intent's rank in the priority order above.
+_FLAT_KEYWORDS = tuple(kw for kws in _INTENTS.values() for kw in kws)
+_FLAT_INTENTS  = tuple(intent for intent, kws in _INTENTS.items() for _ in kws)
+_INTENT_RANK   = {intent: i for i, intent in enumerate(_INTENTS)}
+
+# Longest-first so the alternation prefers the longest keyword at any position.
+_ALL_KEYWORDS = sorted({kw for kws in _INTENTS.values() for kw in kws},
+                       key=len, reverse=True)
+# Zero-width lookahead so overlapping keywords are all reported
+# ("send message" must not swallow the "message" hit starting inside it).
+_KEYWORD_SCAN_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in _ALL_KEYWORDS) + "))"
+)
+# A keyword that is a PREFIX of a longer keyword is still hidden when the
+# longer one wins at the same position ("send" inside "send message") —
+# record those pairs so the scan credits the prefix too.
+_KEYWORD_PREFIXES: dict[str, tuple[str, ...]] = {}
+for _kw in _ALL_KEYWORDS:
+    _pre = tuple(p for p in _ALL_KEYWORDS if p != _kw and _kw.startswith(p))
+    if _pre:
+        _KEYWORD_PREFIXES[_kw] = _pre
+del _kw
+
+
+_EXACT_UTTERANCE_HITS: dict[str, frozenset] = {}
+
+
+def _scan_keywords(lower: str) -> set:
+    """Return every intent keyword present in *lower* with one regex pass."""
+    # Most short commands ARE a keyword verbatim ("next", "stop", "help") —
+    # serve those from the precomputed table instead of running the scan.
+    hits = _EXACT_UTTERANCE_HITS.get(lower)
+    if hits is not None:
+        return hits
+    hits = set()
+    for m in _KEYWORD_SCAN_RE.finditer(lower):
+        kw = m.group(1)
+        hits.add(kw)
+        hits.update(_KEYWORD_PREFIXES.get(kw, ()))
+    return hits
+
+
+# Hit set the scan produces for each utterance that equals a keyword exactly —
+# captured by running the scan itself, so shorter keywords embedded inside a
+# longer one are included and the lookup is byte-for-byte equivalent.
+_EXACT_UTTERANCE_HITS.update(
+    (kw, frozenset(_scan_keywords(kw))) for kw in _ALL_KEYWORDS
+)
+
+
 # ── Phonetic romanized command variants ──────────────────────────────────────
 # Whisper sometimes transcribes Hindi/Marathi speech using Roman characters
 # instead of Devanagari (especially with the 'base' model and 'en' fallback).
@@ -227,22 +304,60 @@ _PHONETIC_COMMANDS: dict[str, str] = {
     "rukho":           "stop_reading",
 }
 
+# ── Service-scope tables ──────────────────────────────────────────────────────
+# Which intents belong to which service — consulted by the phonetic matcher
+# and the _service_allowed filter inside _detect_intent. Previously rebuilt
+# as set literals on every call (and on every phonetic-loop iteration).
+_EMAIL_ONLY_INTENTS = frozenset({
+    "list_emails", "read_email", "next_email", "prev_email",
+    "read_more", "send_email", "cancel_email", "summarize_email",
+})
+_TELEGRAM_ONLY_INTENTS = frozenset({
+    "send_message", "read_messages", "cancel_message", "summarize_message",
+})
+
+# ── Language-switch triggers ──────────────────────────────────────────────────
+# One compiled alternation per language — the trigger lists only matter at
+# import; _detect_intent just runs a single search() per language code.
+_LANG_KW = {
+    "hi": ["hindi", "switch to hindi", "hindi language", "hindi mode",
+           "change to hindi", "speak hindi", "use hindi"],
+    "mr": ["marathi", "switch to marathi", "marathi language", "marathi mode",
+           "change to marathi", "speak marathi", "use marathi"],
+    "en": ["switch to english", "english language", "english mode",
+           "change to english", "speak english", "use english"],
+    "es": ["spanish", "español", "switch to spanish", "spanish language",
+           "change to spanish", "speak spanish", "use spanish"],
+    "fr": ["french", "français", "francais", "switch to french", "french language",
+           "change to french", "speak french", "use french"],
+    "de": ["german", "deutsch", "switch to german", "german language",
+           "change to german", "speak german", "use german"],
+    "it": ["italian", "italiano", "switch to italian", "italian language",
+           "change to italian", "speak italian", "use italian"],
+    "pt": ["portuguese", "português", "portugues", "switch to portuguese",
+           "portuguese language", "change to portuguese", "speak portuguese"],
+}
+_LANG_PATTERNS = [
+    (code, re.compile("|".join(re.escape(t) for t in triggers)))
+    for code, triggers in _LANG_KW.items()
+]
+
 
 # "stop" is often heard as: top, stock, shop, cop, drop, prop, stuff, step,
 #  stoop, store, storm, sport, spot,ktop, scop, stab, stub, stomp, stoppe
-_STOP_EXACT = {
+_STOP_EXACT = frozenset({
     "stop", "top", "stock", "shop", "cop", "drop", "prop",
     "stuff", "step", "stoop", "store", "stopped", "stopping",
     "stab", "stub", "spot", "stomp", "pause", "paws", "halt",
-    "quiet", "quite", "quite", "silence", "silent",
+    "quiet", "quite", "silence", "silent",
     "enough", "that's enough", "that is enough",
     "shut up", "be quiet", "stop it", "stop reading",
     "pause reading", "stop the email", "no more",
-}
+})
 
 # ── Cancel signals ────────────────────────────────────────────────────────────
 # "cancel" → council, console, consul, cancel, camel, counsel, counsel
-_CANCEL_EXACT = {
+_CANCEL_EXACT = frozenset({
     "cancel", "council", "console", "consul", "camel", "counsel",
     "cancelled", "cancelling",
     "abort", "a board", "aboard",
@@ -251,12 +366,12 @@ _CANCEL_EXACT = {
     "don't send", "do not send", "don't do it",
     "no", "nope", "nah", "not",
     "stop sending", "cancel email", "cancel sending", "cancel it",
-}
+})
 
 # ── Explicit cancel signals (no ambiguous single words like "no", "not") ──────
 # Used at content-entry steps (to, subject, body, text) where user input is
 # expected — single words like "no" must NOT cancel the compose flow.
-_EXPLICIT_CANCEL = {
+_EXPLICIT_CANCEL = frozenset({
     "cancel", "cancel email", "cancel message", "cancel sending",
     "cancel it", "cancel compose",
     "cancelled", "cancelling",
@@ -265,13 +380,13 @@ _EXPLICIT_CANCEL = {
     "forget it", "forget that",
     "don't send", "do not send", "don't do it",
     "stop sending", "exit compose", "stop composing", "quit compose",
-}
+})
 
 # ── Confirm signals ───────────────────────────────────────────────────────────
 # "yes" → yet, yes, yep, yeah, ya, yah, yea, jest, chest
 # "confirm" → conform, conformed, confirmed
 # "ok" → oak, okay, ok, o.k.
-_CONFIRM_EXACT = {
+_CONFIRM_EXACT = frozenset({
     "yes", "yet", "yep", "yeah", "ya", "yah", "yea", "jest",
     # Romanized Hindi/Marathi 'yes' (Whisper output when mic lang is hi/mr)
     "ha", "haa", "haan", "han", "ho", "hoy", "hoji",
@@ -279,7 +394,7 @@ _CONFIRM_EXACT = {
     "ok", "okay", "o.k.", "oak",
     "send it", "do it", "go ahead", "go", "proceed",
     "yes please", "please send", "absolutely", "sure", "correct",
-}
+})
 
 
 # ── Number-word → digit table (covers 0-19 and tens up to 90) ─────────────────
@@ -296,49 +411,118 @@ _NUM_WORDS = {
 _TENS = ["twenty","thirty","forty","fifty","sixty","seventy","eighty","ninety"]
 _ONES = ["one","two","three","four","five","six","seven","eight","nine"]
 
+_TENS_SET = frozenset(_TENS)
+_ONES_SET = frozenset(_ONES)
+
+# Clause punctuation Whisper occasionally glues onto a word ("seven," /
+# "nine.") — stripped for the lookup and re-attached around the digits.
+_TOKEN_PUNCT = '.,!?;:'
+
+
+def _split_punct(w: str) -> tuple[str, str, str]:
+    """Split a token into (leading punctuation, core, trailing punctuation)."""
+    core = w.strip(_TOKEN_PUNCT)
+    if not core or core == w:
+        return "", w, ""
+    start = w.find(core)
+    return w[:start], core, w[start + len(core):]
+
 
 def _replace_number_words(t: str) -> str:
     """Replace spoken number words with digits, e.g. 'twenty nine' → '29'."""
-    # compound tens first ("twenty one" → "21")
-    for ten in _TENS:
-        for one in _ONES:
-            t = re.sub(rf'\b{ten}\s+{one}\b',
-                       str(int(_NUM_WORDS[ten]) + int(_NUM_WORDS[one])), t)
-    # single words
-    for word, digit in _NUM_WORDS.items():
-        t = re.sub(rf'\b{word}\b', digit, t)
-    return t
+    # Single tokenize + dict-lookup walk — the old implementation ran 72
+    # compound-tens regex substitutions plus 28 single-word ones over the
+    # whole string on every call.
+    toks = t.split()
+    out = []
+    i = 0
+    n = len(toks)
+    while i < n:
+        pre, core, post = _split_punct(toks[i])
+        # compound tens first ("twenty one" → "21") — only across a clean
+        # token boundary; "twenty, one" stays two numbers as before
+        if core in _TENS_SET and not post and i + 1 < n:
+            pre2, core2, post2 = _split_punct(toks[i + 1])
+            if core2 in _ONES_SET and not pre2:
+                out.append(pre + str(int(_NUM_WORDS[core]) + int(_NUM_WORDS[core2])) + post2)
+                i += 2
+                continue
+        if core in _NUM_WORDS:
+            core = _NUM_WORDS[core]
+        elif '-' in core:
+            # hyphenated compounds ("twenty-nine") — convert each part
+            core = '-'.join(_NUM_WORDS.get(p, p) for p in core.split('-'))
+        out.append(pre + core + post)
+        i += 1
+    return ' '.join(out)
+
+
+# ── Fused spoken-form normalization pass ──────────────────────────────────────
+# The domain-fix / @ / dot / special-character steps used to run ~20
+# sequential re.sub passes, each walking (and reallocating) the whole
+# string. One alternation with named groups does the same work in a single
+# scan; the callback dispatches on match.lastgroup. Group order mirrors the
+# old pass order so priority at a shared position is unchanged. The bare-"at"
+# rule checks its leading whitespace with a lookbehind (the input is
+# stripped, so space-preceded "at" always has a non-space earlier) and a
+# negative lookahead defers "at the rate"/"at sign" to their own
+# higher-priority alternatives.
+_SPOKEN_FORMS_RE = re.compile(
+    # Domain spoken-form fixes — must outrank the @ substitutes so e.g.
+    # "add" inside a domain phrase resolves as the domain first.
+    r"(?P<gmail>\bg\s*mail\b|\bgemail\b|\bg-mail\b)"
+    r"|(?P<hotmail>\bhot\s*mail\b)"
+    r"|(?P<outlook>\bout\s*look\b)"
+    r"|(?P<yahoo>\byah+oo\b)"
+    r"|(?P<com>\b(?:calm|come|comma|khan|con|gom|cam)\b)"     # "com" mis-heard
+    r"|(?P<tld_in>\b(?:inn|an|and)$)"                         # "in" short form
+    r"|(?P<net>\b(?:naet|neat|met)\b)"
+    r"|(?P<org>\b(?:org|aura|alba)\b)"
+    r"|(?P<edu>\b(?:edu|eddo|ado)\b)"
+    # @ substitutes: "at the rate (of)", "at sign/symbol/mark",
+    # "commercial at", Whisper mis-hearings of "at", bare "at" between two
+    # non-space runs, stray "at" at the start.
+    r"|(?P<at>\bat\s+the\s+rate\s+(?:of\s+)?"
+    r"|\bat\s+(?:sign|symbol|mark)\b"
+    r"|\bcommercial\s+at\b(?!\s+(?:sign|symbol|mark)\b)"
+    r"|\b(?:add|hat|that|had|rat|bat|cat|fat|sat|@)\b"
+    r"|(?<=\s)at\s+(?!the\s+rate\b|sign\b|symbol\b|mark\b)(?=\S)"
+    r"|^at\s+)"
+    # Dot / special-character names (consume surrounding whitespace, as the
+    # old per-step passes did)
+    r"|(?P<dot>\s*\b(?:dot|period|full\s+stop|point|por)\b\s*)"
+    r"|(?P<under>\s*\bunderscore\b\s*)"
+    r"|(?P<dash>\s*\b(?:dash|hyphen|minus)\b\s*)"   # '\x00', see step 4b
+    r"|(?P<plus>\s*\bplus\b\s*)"
+)
+_SPOKEN_REPL = {
+    "gmail": "gmail", "hotmail": "hotmail", "outlook": "outlook",
+    "yahoo": "yahoo", "com": "com", "tld_in": "in", "net": "net",
+    "org": "org", "edu": "edu",
+    "at": "@", "dot": ".", "under": "_", "dash": "\x00", "plus": "+",
+}
 
 
-# ── Known domain spoken-form fixes ────────────────────────────────────────────
-_DOMAIN_FIXES = [
-    # Gmail variants
-    (r'\bg\s*mail\b',       'gmail'),
-    (r'\bgemail\b',         'gmail'),
-    (r'\bg-mail\b',         'gmail'),
-    # Hotmail / Outlook
-    (r'\bhot\s*mail\b',     'hotmail'),
-    (r'\bout\s*look\b',     'outlook'),
-    # Yahoo
-    (r'\byah+oo\b',         'yahoo'),
-    # TLD: "com" mis-heard
-    (r'\b(?:calm|come|comma|khan|con|gom|cam)\b', 'com'),
-    # TLD: "in" short form
-    (r'\b(?:inn|an|and)$',  'in'),
-    # TLD: "net"
-    (r'\b(?:naet|neat|met)\b', 'net'),
-    # TLD: "org"
-    (r'\b(?:org|aura|alba)\b', 'org'),
-    # TLD: "edu"
-    (r'\b(?:edu|eddo|ado)\b', 'edu'),
-]
+def _spoken_sub(m) -> str:
+    return _SPOKEN_REPL[m.lastgroup]
+
 
+_ADDR_FILLER_RE   = re.compile(r'^(?:my\s+)?(?:email\s+(?:is\s+|address\s+is\s+)?'
+                               r'|address\s+is\s+|send\s+(?:it\s+)?to\s+|to\s+)?')
+_ADDR_WS_RE       = re.compile(r'\s+')
+_MULTI_DOT_RE     = re.compile(r'\.{2,}')
+_MULTI_AT_RE      = re.compile(r'@{2,}')
 
+
+@lru_cache(maxsize=256)
 def _normalize_email_address(text: str) -> str:
     """
     Convert a spoken email address to a valid format.
     Handles the many ways Whisper mis-transcribes email components.
 
+    Pure text→text, so the result is memoized — users re-say the same
+    address after a validation failure and retries skip the whole pipeline.
+
     Pronunciation guide spoken to the user:
         name  [at / at the rate / @ / add / hat]  domain  [dot / period / full stop]  tld
     """
@@ -347,35 +531,11 @@ def _normalize_email_address(text: str) -> str:
     # ── 0. Number words → digits ──────────────────────────────────────────────
     t = _replace_number_words(t)
 
-    # ── 1. Domain spoken-form fixes (before @ replacement so 'add' isn't
-    #        accidentally turned into a digit) ─────────────────────────────────
-    for pattern, replacement in _DOMAIN_FIXES:
-        t = re.sub(pattern, replacement, t)
-
-    # ── 2. @ substitutes ─────────────────────────────────────────────────────
-    # "at the rate (of)?"
-    t = re.sub(r'\bat\s+the\s+rate\s+(?:of\s+)?', '@', t)
-    # "at sign" / "at symbol" / "@ symbol"
-    t = re.sub(r'\bat\s+(?:sign|symbol|mark)\b', '@', t)
-    # "commercial at"
-    t = re.sub(r'\bcommercial\s+at\b', '@', t)
-    # Whisper sometimes mis-hears "at" as "add" / "hat" / "that" / "had" / "rat" / "bat"
-    t = re.sub(r'\b(?:add|hat|that|had|rat|bat|cat|fat|sat|@)\b', '@', t)
-    # Plain "at" between two non-space sequences
-    t = re.sub(r'(?<=\S)\s+at\s+(?=\S)', '@', t)
-    # Remove stray "at" at start if it survived
-    t = re.sub(r'^at\s+', '@', t)
-
-    # ── 3. Dot substitutes ────────────────────────────────────────────────────
-    # "full stop", "period", "point", "dot"
-    t = re.sub(r'\s*\b(?:dot|period|full\s+stop|point|por)\b\s*', '.', t)
-
-    # ── 4. Special character names ────────────────────────────────────────────
-    t = re.sub(r'\s*\bunderscore\b\s*', '_', t)
-    # Use a null-byte placeholder for intentional dashes (spoken as "dash"/"hyphen")
-    # so they survive the Whisper-separator removal in step 4b below.
-    t = re.sub(r'\s*\b(?:dash|hyphen|minus)\b\s*', '\x00', t)
-    t = re.sub(r'\s*\bplus\b\s*', '+', t)
+    # ── 1-4. Domain fixes, @ substitutes, dot words, special characters ──────
+    # One fused alternation pass — see _SPOKEN_FORMS_RE above. Intentional
+    # dashes (spoken "dash"/"hyphen") become a '\x00' placeholder so they
+    # survive the Whisper-separator removal in step 4b below.
+    t = _SPOKEN_FORMS_RE.sub(_spoken_sub, t)
 
     # ── 4b. Strip Whisper-inserted letter-separator hyphens ───────────────────
     # When the user spells out their email letter-by-letter, Whisper inserts
@@ -392,16 +552,15 @@ def _normalize_email_address(text: str) -> str:
 
     # ── 5. Strip filler words that creep in ───────────────────────────────────
     # "my email is", "send to", "the address is", etc.
-    t = re.sub(r'^(?:my\s+)?(?:email\s+(?:is\s+|address\s+is\s+)?'  \
-               r'|address\s+is\s+|send\s+(?:it\s+)?to\s+|to\s+)?', '', t)
+    t = _ADDR_FILLER_RE.sub('', t)
 
     # ── 6. Collapse whitespace inside the address ─────────────────────────────
     # At this point anything left that is a space inside the email is wrong
-    t = re.sub(r'\s+', '', t)
+    t = _ADDR_WS_RE.sub('', t)
 
     # ── 7. Cleanup double punctuation / leading-trailing junk ─────────────────
-    t = re.sub(r'\.{2,}', '.', t)   # ".." → "."
-    t = re.sub(r'@{2,}', '@', t)    # "@@" → "@"
+    t = _MULTI_DOT_RE.sub('.', t)   # ".." → "."
+    t = _MULTI_AT_RE.sub('@', t)    # "@@" → "@"
     t = t.strip('.@_-\x00')
 
     # ── 8. Restore intentional dashes (spoken as "dash"/"hyphen") ─────────────
@@ -410,37 +569,74 @@ def _normalize_email_address(text: str) -> str:
     return t
 
 
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
 def _is_valid_email(addr: str) -> bool:
     """Basic sanity check — must have exactly one @ and at least one dot after it."""
-    return bool(re.match(r'^[^@\s]+@[^@\s]+\.[^@\s]+$', addr))
+    return bool(_EMAIL_RE.match(addr))
 
 
-def _fuzzy_match(word: str, targets: set, cutoff: float = 0.72) -> bool:
+@lru_cache(maxsize=2048)
+def _fuzzy_match(word: str, targets: frozenset, cutoff: float = 0.72) -> bool:
     """
     Return True if `word` is close enough to any string in `targets`.
     Uses SequenceMatcher ratio — tolerates 1-2 character substitutions.
+    With rapidfuzz installed the same ratio runs in C instead of pure
+    Python, which matters when the fallback sweeps every intent keyword.
+    Memoized: the same handful of tokens ("send", "stop", "yes"…) recur
+    constantly against the same frozen target sets.
     """
     word = word.strip()
+    if not word:
+        return False
     if word in targets:
         return True
+    if _rf_process is not None:
+        return _rf_process.extractOne(
+            word, targets, scorer=_rf_fuzz.ratio, score_cutoff=cutoff * 100
+        ) is not None
     matches = difflib.get_close_matches(word, targets, n=1, cutoff=cutoff)
     return bool(matches)
 
 
-def _any_token_matches(text: str, targets: set, cutoff: float = 0.72) -> bool:
+def _any_token_matches(text: str, targets: set, cutoff: float = 0.72,
+                       words: list[str] | None = None) -> bool:
     """
     Check every individual word in `text` AND the full phrase against `targets`.
     Short utterances (≤3 words) get a slightly more lenient cutoff, but
     never below 0.78 — prevents common words ('send','read') fuzzy-matching
     into the stop-word set.
+
+    Callers that check the same utterance against several target sets pass
+    the already-lowered text plus its `words` to skip re-splitting per call.
     """
-    words = text.lower().split()
+    if words is None:
+        lower = text.lower()
+        words = lower.split()
+    else:
+        lower = text
+    # Exact probe first — most stop/cancel/confirm utterances ("yes",
+    # "stop", "cancel") hit the frozenset directly, no scoring needed.
+    if lower in targets or not targets.isdisjoint(words):
+        return True
+
     # short utterance → be more lenient, but floor at 0.78
     if len(words) <= 3:
         cutoff = min(cutoff, 0.78)
 
+    if _rf_process is not None:
+        # One vectorized C call scoring every token (and the full phrase)
+        # against every target at once, instead of len(words) × len(targets)
+        # interpreter round-trips. Exact hits score 100 and clear any cutoff.
+        scores = _rf_process.cdist(
+            words + [lower], tuple(targets),
+            scorer=_rf_fuzz.ratio, score_cutoff=cutoff * 100,
+        )
+        return bool(scores.any())
+
     # full phrase check
-    if _fuzzy_match(text.lower(), targets, cutoff):
+    if _fuzzy_match(lower, targets, cutoff):
         return True
     # per-word check
     for w in words:
@@ -449,10 +645,81 @@ def _any_token_matches(text: str, targets: set, cutoff: float = 0.72) -> bool:
     return False
 
 
+@lru_cache(maxsize=512)
+def _fuzzy_classify(lower: str, active_service: str | None) -> str:
+    """
+    difflib fallback over every intent keyword — the most expensive branch
+    of intent detection. Pure in (text, service), so the cache turns
+    repeated mis-transcriptions into a dict hit.
+    """
+    # Prune tokens that can't clear the 0.70 cutoff against any keyword:
+    # the shortest keyword is 2 chars, so a 1-char token tops out at
+    # 2*1/(1+2) ≈ 0.67, and the only digits in the table sit inside long
+    # phrases ("email 2"), far out of reach of a digit-only token.
+    words = [w for w in lower.split() if len(w) > 1 and not w.isdigit()]
+    if _rf_process is not None and words:
+        # One C call scores every token against every keyword at once; the
+        # matching columns then map back through _FLAT_INTENTS, keeping the
+        # lowest-ranked (highest-priority) intent to match the loop below.
+        scores = _rf_process.cdist(
+            words, _FLAT_KEYWORDS, scorer=_rf_fuzz.ratio, score_cutoff=70,
+        )
+        best, best_rank = "unknown", len(_INTENT_RANK)
+        for col in scores.any(axis=0).nonzero()[0]:
+            intent = _FLAT_INTENTS[col]
+            if active_service == "email" and intent in _TELEGRAM_ONLY_INTENTS:
+                continue
+            if active_service == "telegram" and intent in _EMAIL_ONLY_INTENTS:
+                continue
+            rank = _INTENT_RANK[intent]
+            if rank < best_rank:
+                best, best_rank = intent, rank
+        return best
+    for intent, kw_set in _INTENT_KW_SETS.items():
+        if active_service == "email" and intent in _TELEGRAM_ONLY_INTENTS:
+            continue
+        if active_service == "telegram" and intent in _EMAIL_ONLY_INTENTS:
+            continue
+        for w in words:
+            if _fuzzy_match(w, kw_set, cutoff=0.70):
+                return intent
+    return "unknown"
+
+
+# ── Summarize / positional-navigation patterns ───────────────────────────────
+# Compiled once; _detect_intent gates them behind cheap substring checks so
+# most utterances never enter the regex engine for these.
+_SUM_ALL_RE  = re.compile(r'\b(?:summarize|summarise)\s+(?:all|each|every|inbox)\b')
+_SUM_NUM_RE  = re.compile(
+    r'\b(?:summarize|summarise)\s+(?:email|mail)?\s*'
+    r'(one|two|three|four|five|1|2|3|4|5)\b'
+)
+_SUM_BARE_RE = re.compile(r'\b(?:summarize|summarise)\b')
+_SUM_NUM_MAP = {
+    "one": 0, "1": 0, "two": 1, "2": 1, "three": 2, "3": 2,
+    "four": 3, "4": 3, "five": 4, "5": 4,
+}
+
+_POS_NAV_RE = re.compile(
+    r'(?:read|open|show|play)\s+(?:email|mail|message|number|no\.?)\s*'
+    r'(one|two|three|four|five|1|2|3|4|5)\b'
+)
+_POS_NAV_ALT_RE = re.compile(
+    r'(?:email|message)\s+(?:number\s+)?(one|two|three|four|five|1|2|3|4|5)\b'
+)
+_POS_NUM_MAP = {
+    "one": 1, "1": 1, "two": 2, "2": 2, "three": 3, "3": 3,
+    "four": 4, "4": 4, "five": 5, "5": 5,
+}
+
+
 def _detect_intent(text: str, session: dict) -> str:
     lower = text.lower().strip()
     if not lower:
         return "unknown"
+    # Split once — the compose branches below probe the same utterance
+    # against several signal sets in a row.
+    words = lower.split()
 
     # ── While message compose is active ──────────────────────────────────────
     # Each step has different cancel sensitivity to avoid false positives.
@@ -462,36 +729,36 @@ def _detect_intent(text: str, session: dict) -> str:
         if step == "to":
             # Capturing contact name: ONLY cancel on unambiguous explicit phrases.
             # Single words like "no", "not", "nope" must NOT cancel here.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_message"
             return "send_message"  # any utterance = contact name
 
         elif step == "to_confirm":
             # User is confirming the name or providing a correction.
             # Explicit cancel → cancel. Confirm words → advance. Anything else = correction.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_message"
-            if _any_token_matches(lower, _CONFIRM_EXACT):
+            if _any_token_matches(lower, _CONFIRM_EXACT, words=words):
                 return "send_message"  # confirmed
             return "send_message"  # treat as corrected name
 
         elif step == "text":
             # Capturing message body: ONLY cancel on explicit phrases.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_message"
             return "send_message"  # any utterance = message content
 
         elif step == "confirm":
             # Final confirm/cancel step: yes/no both fully valid here.
-            if _any_token_matches(lower, _CONFIRM_EXACT):
+            if _any_token_matches(lower, _CONFIRM_EXACT, words=words):
                 return "send_message"
-            if _any_token_matches(lower, _CANCEL_EXACT):
+            if _any_token_matches(lower, _CANCEL_EXACT, words=words):
                 return "cancel_message"
             return "cancel_message"  # unknown at confirm = treat as cancel
 
         else:
             # Unknown step fallback
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_message"
             return "send_message"
 
@@ -501,37 +768,37 @@ def _detect_intent(text: str, session: dict) -> str:
 
         if step == "to":
             # Capturing recipient address: only explicit cancel phrases cancel.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_email"
             return "send_email"
 
         elif step == "subject":
             # Capturing subject: only explicit cancel.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_email"
             return "send_email"
 
         elif step == "body":
             # Capturing body: only explicit cancel.
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_email"
             return "send_email"
 
         elif step == "confirm":
             # Final confirm/cancel step: all cancel words valid here.
-            if _any_token_matches(lower, _CONFIRM_EXACT):
+            if _any_token_matches(lower, _CONFIRM_EXACT, words=words):
                 return "send_email"
-            if _any_token_matches(lower, _CANCEL_EXACT):
+            if _any_token_matches(lower, _CANCEL_EXACT, words=words):
                 return "cancel_email"
             return "cancel_email"  # unknown at confirm = treat as cancel
 
         else:
-            if _any_token_matches(lower, _EXPLICIT_CANCEL):
+            if _any_token_matches(lower, _EXPLICIT_CANCEL, words=words):
                 return "cancel_email"
             return "send_email"
 
     # ── Stop reading (checked before general intents) ─────────────────────────
-    if _any_token_matches(lower, _STOP_EXACT):
+    if _any_token_matches(lower, _STOP_EXACT, words=words):
         return "stop_reading"
 
     # ── Native-language command matching (offline fallback) ───────────────────
@@ -559,18 +826,12 @@ def _detect_intent(text: str, session: dict) -> str:
         if _phrase in lower:
             # Respect service filter so telegram-only intents don't fire in email mode
             _es_active = session.get("active_service")
-            _EMAIL_ONLY   = {"list_emails", "read_email", "next_email", "prev_email",
-                             "read_more", "send_email", "cancel_email", "summarize_email"}
-            _TELE_ONLY    = {"send_message", "read_messages", "cancel_message", "summarize_message"}
-            if _es_active == "email"    and _intent in _TELE_ONLY:   continue
-            if _es_active == "telegram" and _intent in _EMAIL_ONLY:  continue
+            if _es_active == "email"    and _intent in _TELEGRAM_ONLY_INTENTS:  continue
+            if _es_active == "telegram" and _intent in _EMAIL_ONLY_INTENTS:     continue
             return _intent
 
     # ── Service-aware routing: skip intents that don't belong to active service
     active_service = session.get("active_service")  # 'email' | 'telegram' | None
-    _EMAIL_ONLY_INTENTS    = {"list_emails", "read_email", "next_email", "prev_email",
-                               "read_more", "send_email", "cancel_email", "summarize_email"}
-    _TELEGRAM_ONLY_INTENTS = {"send_message", "read_messages", "cancel_message", "summarize_message"}
 
     def _service_allowed(intent: str) -> bool:
         if active_service == "email"    and intent in _TELEGRAM_ONLY_INTENTS:
@@ -580,27 +841,18 @@ def _detect_intent(text: str, session: dict) -> str:
         return True
 
     # ── "summarize email N" / "summarize all" ────────────────────────────────
-    _sum_num_map = {
-        "one": 0, "1": 0, "two": 1, "2": 1, "three": 2, "3": 2,
-        "four": 3, "4": 3, "five": 4, "5": 4,
-    }
-    if _service_allowed("summarize_email"):
-        sum_all = re.search(
-            r'\b(?:summarize|summarise)\s+(?:all|each|every|inbox)\b', lower
-        )
-        if sum_all:
+    # Gated on a substring check — both spellings share the 'summari' stem,
+    # so everything else skips all three patterns with one str scan.
+    if "summari" in lower and _service_allowed("summarize_email"):
+        if _SUM_ALL_RE.search(lower):
             session["_summarize_all"] = True
             session.pop("_summarize_idx", None)
             session.modified = True
             return "summarize_email"
 
-        sum_num = re.search(
-            r'\b(?:summarize|summarise)\s+(?:email|mail)?\s*'
-            r'(one|two|three|four|five|1|2|3|4|5)\b',
-            lower
-        )
+        sum_num = _SUM_NUM_RE.search(lower)
         if sum_num:
-            session["_summarize_idx"] = _sum_num_map.get(sum_num.group(1), 0)
+            session["_summarize_idx"] = _SUM_NUM_MAP.get(sum_num.group(1), 0)
             session.pop("_summarize_all", None)
             session.modified = True
             return "summarize_email"
@@ -608,72 +860,41 @@ def _detect_intent(text: str, session: dict) -> str:
         # Bare "summarize [email/mail/this/the/...]" — must be caught here
         # BEFORE the standard intent loop where read_email's "email" keyword
         # would otherwise match first.
-        if re.search(r'\b(?:summarize|summarise)\b', lower):
+        if _SUM_BARE_RE.search(lower):
             session.pop("_summarize_idx", None)
             session.pop("_summarize_all", None)
             return "summarize_email"
 
     # ── "read email N" / "email number N" — positional navigation ──────────
-    _num_map = {
-        "one": 1, "1": 1, "two": 2, "2": 2, "three": 3, "3": 3,
-        "four": 4, "4": 4, "five": 5, "5": 5,
-    }
-    m = re.search(
-        r'(?:read|open|show|play)\s+(?:email|mail|message|number|no\.?)\s*'
-        r'(one|two|three|four|five|1|2|3|4|5)\b',
-        lower
-    )
-    if not m:
-        m = re.search(r'(?:email|message)\s+(?:number\s+)?(one|two|three|four|five|1|2|3|4|5)\b', lower)
-    if m:
-        if _service_allowed("next_email"):
-            session["_goto_email_idx"] = _num_map.get(m.group(1), 1) - 1
+    # The noun alternations can't match without one of these substrings
+    # ('mail' covers 'email'), so most utterances skip both searches.
+    if ("mail" in lower or "message" in lower
+            or "number" in lower or "no" in lower):
+        m = _POS_NAV_RE.search(lower) or _POS_NAV_ALT_RE.search(lower)
+        if m and _service_allowed("next_email"):
+            session["_goto_email_idx"] = _POS_NUM_MAP.get(m.group(1), 1) - 1
             session.modified = True
             return "next_email"
 
     # ── Language switching — highest priority, not filtered by active service ──
-    _LANG_KW = {
-        "hi": ["hindi", "switch to hindi", "hindi language", "hindi mode",
-               "change to hindi", "speak hindi", "use hindi"],
-        "mr": ["marathi", "switch to marathi", "marathi language", "marathi mode",
-               "change to marathi", "speak marathi", "use marathi"],
-        "en": ["switch to english", "english language", "english mode",
-               "change to english", "speak english", "use english"],
-        "es": ["spanish", "español", "switch to spanish", "spanish language",
-               "change to spanish", "speak spanish", "use spanish"],
-        "fr": ["french", "français", "francais", "switch to french", "french language",
-               "change to french", "speak french", "use french"],
-        "de": ["german", "deutsch", "switch to german", "german language",
-               "change to german", "speak german", "use german"],
-        "it": ["italian", "italiano", "switch to italian", "italian language",
-               "change to italian", "speak italian", "use italian"],
-        "pt": ["portuguese", "português", "portugues", "switch to portuguese",
-               "portuguese language", "change to portuguese", "speak portuguese"],
-    }
-    for _lc, _triggers in _LANG_KW.items():
-        if any(t in lower for t in _triggers):
+    for _lc, _rx in _LANG_PATTERNS:
+        if _rx.search(lower):
             session["_set_lang_code"] = _lc
             session.modified = True
             return "set_language"
 
     # ── Standard intent matching ──────────────────────────────────────────────
-    for intent, keywords in _INTENTS.items():
-        if not _service_allowed(intent):
-            continue
-        if any(kw in lower for kw in keywords):
-            return intent
-
-    # Fuzzy fallback
-    words = lower.split()
-    for intent, keywords in _INTENTS.items():
-        if not _service_allowed(intent):
-            continue
-        kw_set = set(keywords)
-        for w in words:
-            if _fuzzy_match(w, kw_set, cutoff=0.70):
+    hits = _scan_keywords(lower)
+    if hits:
+        for intent, kw_set in _INTENT_KW_SETS.items():
+            if not _service_allowed(intent):
+                continue
+            if not hits.isdisjoint(kw_set):
                 return intent
 
-    return "unknown"
+    # Fuzzy fallback — memoized; repeated confirm/cancel/retry utterances
+    # skip the difflib sweep entirely
+    return _fuzzy_classify(lower, active_service)
 
 
 # ── Email reading helpers ──────────────────────────────────────────────────────
@@ -681,7 +902,11 @@ _CHUNK_SIZE = 400   # chars per spoken navigation chunk (~30 s at 165 WPM)
 
 # Server-side cache to avoid Flask session-cookie overflow (4 KB limit).
 # Keyed by user email address — survives the request lifetime of the process.
-_EMAIL_STORE: dict[str, list] = {}
+# LRU-bounded: each entry pins ~5 email dicts (bodies included) in memory,
+# so without a cap a long-running worker grows with every distinct user.
+_EMAIL_STORE: OrderedDict[str, list] = OrderedDict()
+_EMAIL_STORE_MAX = 128
+_EMAIL_STORE_LOCK = threading.Lock()
 
 
 def _store_key(session: dict) -> str:
@@ -696,11 +921,13 @@ def _cache_emails(session: dict, limit: int = 5) -> list:
     """Fetch emails and store in _EMAIL_STORE (NOT in the cookie-based session)."""
     emails = fetch_emails(session, limit=limit)
     key = _store_key(session)
-    _EMAIL_STORE[key] = emails
+    with _EMAIL_STORE_LOCK:
+        _EMAIL_STORE[key] = emails
+        _EMAIL_STORE.move_to_end(key)
+        while len(_EMAIL_STORE) > _EMAIL_STORE_MAX:
+            _EMAIL_STORE.popitem(last=False)
     # Only store lightweight navigation pointers in the session cookie
-    session["_email_cache_key"]  = key
-    session["_email_read_idx"]   = 0
-    session["_email_read_chunk"] = 0
+    session.update(_email_cache_key=key, _email_read_idx=0, _email_read_chunk=0)
     session.modified = True
     return emails
 
@@ -708,14 +935,43 @@ def _cache_emails(session: dict, limit: int = 5) -> list:
 def _get_cached_emails(session: dict) -> list | None:
     """Return the cached email list for this user, or None if not cached."""
     key = session.get("_email_cache_key") or _store_key(session)
-    return _EMAIL_STORE.get(key)
+    with _EMAIL_STORE_LOCK:
+        emails = _EMAIL_STORE.get(key)
+        if emails is not None:
+            _EMAIL_STORE.move_to_end(key)
+    return emails
 
 
 # ── TTS-safe text helpers ──────────────────────────────────────────────────────
 
+_READABLE_RE  = re.compile(r'[@.]')
+_READABLE_MAP = {'@': ' at ', '.': ' dot '}
+
+
+@lru_cache(maxsize=1024)
+def _readable_email(addr: str) -> str:
+    """Spell an address the way it should be spoken: @ → ' at ', . → ' dot '.
+
+    One regex pass instead of two chained str.replace sweeps; memoized since
+    the same address is read back at every step of a compose session.
+    """
+    return _READABLE_RE.sub(lambda m: _READABLE_MAP[m.group(0)], addr)
+
+
+# Compiled once — these run on every sender/subject/body a spoken turn touches.
+_ANGLE_ADDR_RE = re.compile(r'^(.*?)<([^>]+)>')
+_TAG_RE        = re.compile(r'<[^>]*>')
+_MARKDOWN_RE   = re.compile(r'[*_`#~]')
+_MULTI_DASH_RE = re.compile(r'[-]{2,}')
+_URL_RE        = re.compile(r'https?://\S+')
+
+
+@lru_cache(maxsize=512)
 def _clean_sender(from_str: str) -> str:
     """
     Convert a raw RFC-2822 From header into a short, TTS-safe spoken form.
+    Pure string → string, so results are memoized — the same senders come
+    back on every list/read/next/prev turn over one inbox snapshot.
 
     Examples
     --------
@@ -726,7 +982,7 @@ def _clean_sender(from_str: str) -> str:
     s = from_str.strip()
 
     # 1. Extract display name and address parts
-    m = re.match(r'^(.*?)<([^>]+)>', s)
+    m = _ANGLE_ADDR_RE.match(s)
     if m:
         display = m.group(1).strip().strip('"').strip("'").strip()
         addr    = m.group(2).strip()
@@ -736,34 +992,36 @@ def _clean_sender(from_str: str) -> str:
             display = display[:60].rstrip()
             return _tts_safe(display)
         # Otherwise speak the address in a readable way
-        return _tts_safe(addr.replace("@", " at ").replace(".", " dot "))
+        return _tts_safe(_readable_email(addr))
     # No angle brackets — might be a plain address or plain name
     if "@" in s:
-        return _tts_safe(s.replace("@", " at ").replace(".", " dot "))
+        return _tts_safe(_readable_email(s))
     return _tts_safe(s[:80])
 
 
+@lru_cache(maxsize=512)
 def _tts_safe(text: str) -> str:
     """
     Strip characters that confuse pyttsx3/SAPI5 SSML parser and clean up
     whitespace so the engine produces reliable untruncated audio.
+    Memoized — subjects and senders repeat across navigation turns.
 
     SAPI5 interprets < > as XML/SSML tags; encountering a malformed tag
     silently aborts audio generation — hence the 'stops at sender' bug.
     """
     # Remove SSML/XML angle-bracket constructs entirely
-    text = re.sub(r'<[^>]*>', ' ', text)
+    text = _TAG_RE.sub(' ', text)
     # Replace remaining stray < > & with safe equivalents
     text = text.replace('&', ' and ').replace('<', ' ').replace('>', ' ')
     # Strip markdown-style formatting
-    text = re.sub(r'[*_`#~]', '', text)
+    text = _MARKDOWN_RE.sub('', text)
     # Collapse repeated punctuation
-    text = re.sub(r'[.]{2,}', '.', text)
-    text = re.sub(r'[-]{2,}', '-', text)
+    text = _MULTI_DOT_RE.sub('.', text)
+    text = _MULTI_DASH_RE.sub('-', text)
     # URLs are unreadable — replace with "link"
-    text = re.sub(r'https?://\S+', 'link', text)
+    text = _URL_RE.sub('link', text)
     # Collapse whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _ADDR_WS_RE.sub(' ', text).strip()
     return text
 
 
@@ -789,13 +1047,45 @@ def _normalize_contact_name(raw: str) -> str:
     return text
 
 
-def _read_email_at(email: dict, idx: int, total: int, chunk: int = 0) -> str:
+def _hydrate_body(session: dict, email: dict) -> None:
+    """
+    Fill in email["body"] on demand. The inbox list fetch is metadata-only
+    (headers + snippet); the full body is pulled the first time a message is
+    actually read and written back into the cached dict so navigation and
+    'read more' reuse it.
+    """
+    if email.get("body") or not email.get("id"):
+        return
+    body = fetch_email_body(session, email["id"]).strip()
+    if body:
+        email["body"] = body
+        # A cleaned body derived from the snippet is stale now
+        email.pop("_tts_body", None)
+
+
+def _speakable_body(email: dict) -> str:
+    """
+    Return the TTS-cleaned body for a cached email dict, computing it once.
+
+    The dicts live in _EMAIL_STORE for the whole navigation session, so the
+    cleaned text rides along with them — chunk steps ("read more") index
+    into it without re-hashing a multi-KB body through the _tts_safe cache.
+    """
+    body = email.get("_tts_body")
+    if body is None:
+        body = _tts_safe(
+            (email.get("body") or email.get("snippet") or "No content").strip()
+        )
+        email["_tts_body"] = body
+    return body
+
+
+def _read_email_at(session: dict, email: dict, idx: int, total: int, chunk: int = 0) -> str:
     """Speak one email, paginating the body into chunks."""
+    _hydrate_body(session, email)
     sender  = _clean_sender(email.get("from", "Unknown"))
     subject = _tts_safe(email.get("subject", "No subject"))
-    body    = _tts_safe(
-        (email.get("body") or email.get("snippet") or "No content").strip()
-    )
+    body    = _speakable_body(email)
 
     start     = chunk * _CHUNK_SIZE
     body_part = body[start : start + _CHUNK_SIZE]
@@ -825,11 +1115,38 @@ def _read_email_at(email: dict, idx: int, total: int, chunk: int = 0) -> str:
 
 
 # ── Intent handlers ────────────────────────────────────────────────────────────
+
+# Canned responses spoken verbatim every session — shared between their
+# handlers and warm_tts_prompts below so the warm list can't drift.
+_EMPTY_INBOX_TEXT  = "Your inbox is empty or I could not retrieve your emails."
+_CANCEL_EMAIL_TEXT = "Email cancelled. What else can I help you with?"
+_CANCEL_MSG_TEXT   = "Message cancelled. What else can I help you with?"
+_LOGOUT_TEXT       = "You have been logged out. Goodbye!"
+
+
+def warm_tts_prompts() -> None:
+    """
+    Render the short canned prompts once at startup so a session's first
+    cancel/logout/empty-inbox turn is a render-cache hit instead of a cold
+    pyttsx3 synthesis. Runs on a daemon thread from app.py; a failure just
+    means those turns pay the normal first-render cost.
+    """
+    if Config.CLIENT_TTS:
+        return
+    for text in (_EMPTY_INBOX_TEXT, _CANCEL_EMAIL_TEXT,
+                 _CANCEL_MSG_TEXT, _LOGOUT_TEXT):
+        try:
+            speak_to_file(text)
+        except Exception:
+            logger.debug("TTS prompt warm-up failed", exc_info=True)
+            return
+
+
 def _handle_list_emails(session: dict) -> str:
     """List subjects + senders so user knows what's in inbox before reading."""
     emails = _cache_emails(session, limit=5)
     if not emails:
-        return "Your inbox is empty or I could not retrieve your emails."
+        return _EMPTY_INBOX_TEXT
     lines = []
     for i, e in enumerate(emails, 1):
         lines.append(
@@ -847,8 +1164,8 @@ def _handle_read_email(session: dict) -> str:
     """Read the first (latest) email and cache all 5 for navigation."""
     emails = _cache_emails(session, limit=5)
     if not emails:
-        return "Your inbox is empty or I could not retrieve your emails."
-    return _read_email_at(emails[0], 0, len(emails), chunk=0)
+        return _EMPTY_INBOX_TEXT
+    return _read_email_at(session, emails[0], 0, len(emails), chunk=0)
 
 
 def _handle_next_email(session: dict) -> str:
@@ -870,10 +1187,9 @@ def _handle_next_email(session: dict) -> str:
             "Say 'list emails' to hear the subjects again."
         )
 
-    session["_email_read_idx"]   = idx
-    session["_email_read_chunk"] = 0
+    session.update(_email_read_idx=idx, _email_read_chunk=0)
     session.modified = True
-    return _read_email_at(emails[idx], idx, len(emails), chunk=0)
+    return _read_email_at(session, emails[idx], idx, len(emails), chunk=0)
 
 
 def _handle_prev_email(session: dict) -> str:
@@ -886,10 +1202,9 @@ def _handle_prev_email(session: dict) -> str:
     if idx < 0:
         return "You're already at the first email."
 
-    session["_email_read_idx"]   = idx
-    session["_email_read_chunk"] = 0
+    session.update(_email_read_idx=idx, _email_read_chunk=0)
     session.modified = True
-    return _read_email_at(emails[idx], idx, len(emails), chunk=0)
+    return _read_email_at(session, emails[idx], idx, len(emails), chunk=0)
 
 
 def _handle_read_more(session: dict) -> str:
@@ -901,7 +1216,10 @@ def _handle_read_more(session: dict) -> str:
     if not emails or idx >= len(emails):
         return "No email is currently being read. Say 'read emails' to start."
 
-    body  = (emails[idx].get("body") or emails[idx].get("snippet") or "").strip()
+    _hydrate_body(session, emails[idx])
+    # End-of-message check runs against the same cleaned text that gets
+    # spoken, so the boundary matches what the user actually heard.
+    body  = _speakable_body(emails[idx])
     start = chunk * _CHUNK_SIZE
     if start >= len(body):
         nxt = idx + 1
@@ -911,7 +1229,7 @@ def _handle_read_more(session: dict) -> str:
 
     session["_email_read_chunk"] = chunk
     session.modified = True
-    return _read_email_at(emails[idx], idx, len(emails), chunk=chunk)
+    return _read_email_at(session, emails[idx], idx, len(emails), chunk=chunk)
 
 
 
@@ -924,7 +1242,7 @@ def _handle_stop_reading() -> str:
 def _handle_cancel_email(session: dict) -> str:
     session.pop("email_compose", None)
     session.modified = True
-    return "Email cancelled. What else can I help you with?"
+    return _CANCEL_EMAIL_TEXT
 
 
 def _handle_summarize_email(session: dict) -> str:
@@ -945,6 +1263,7 @@ def _handle_summarize_email(session: dict) -> str:
 
     def _one_line(email: dict, number: int) -> str:
         """Return a sharp 1-line summary string for a single email dict."""
+        _hydrate_body(session, email)
         body    = (email.get("body") or email.get("snippet") or "").strip()
         subject = _tts_safe(email.get("subject", "No subject"))
         sender  = _clean_sender(email.get("from", "Unknown"))
@@ -1058,7 +1377,9 @@ def _handle_send_email(session: dict, transcription: str, eng_text: str = "") ->
         if not _is_valid_email(to_addr):
             # Keep step as "to", increment retry counter
             new_retries = retries + 1
-            session["email_compose"] = dict(compose, to_retries=new_retries)
+            # Mutate the compose dict in place — dict(compose, ...) copied the
+            # whole state and re-bound it through the session on every turn.
+            compose["to_retries"] = new_retries
             session.modified = True
             if new_retries >= 2:
                 # After 2 failures, suggest typing
@@ -1073,26 +1394,30 @@ def _handle_send_email(session: dict, transcription: str, eng_text: str = "") ->
                 "r u t i k at gmail dot com."
             )
 
-        session["email_compose"] = dict(compose, to=to_addr, step="subject", to_retries=0)
+        compose["to"] = to_addr
+        compose["step"] = "subject"
+        compose["to_retries"] = 0
         session.modified = True
-        readable = to_addr.replace("@", " at ").replace(".", " dot ")
+        readable = _readable_email(to_addr)
         return f"Got it — sending to {readable}. What is the subject?"
 
     # ── Step 2: subject ───────────────────────────────────────────────────────
     elif step == "subject":
         subject = transcription.strip()
-        session["email_compose"] = dict(compose, subject=subject, step="body")
+        compose["subject"] = subject
+        compose["step"] = "body"
         session.modified = True
         return f"Subject: {subject}. What is your message?"
 
     # ── Step 3: body ─────────────────────────────────────────────────────────
     elif step == "body":
         body    = transcription.strip()
-        session["email_compose"] = dict(compose, body=body, step="confirm")
+        compose["body"] = body
+        compose["step"] = "confirm"
         session.modified = True
         to      = compose["to"]
         subject = compose["subject"]
-        readable_to = to.replace("@", " at ").replace(".", " dot ")
+        readable_to = _readable_email(to)
         return (
             f"Ready to send. "
             f"To: {readable_to}. Subject: {subject}. "
@@ -1114,7 +1439,7 @@ def _handle_send_email(session: dict, transcription: str, eng_text: str = "") ->
             try:
                 success, message = send_email(session, to, subject, body)
                 if success:
-                    readable_to = to.replace("@", " at ").replace(".", " dot ")
+                    readable_to = _readable_email(to)
                     return f"Email sent successfully to {readable_to}!"
                 else:
                     logger.error("Send email returned failure: %s", message)
@@ -1179,7 +1504,9 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
     # Step 1 — capture contact name → ask to confirm
     if step == "to":
         name = _normalize_contact_name(transcription)
-        session["msg_compose"] = dict(compose, to=name, step="to_confirm")
+        # In-place mutation, same as the email compose steps above
+        compose["to"] = name
+        compose["step"] = "to_confirm"
         session.modified = True
         return (
             f"I heard {name}. "
@@ -1193,7 +1520,7 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
         # Also check native phrases directly as offline fallback.
         if _any_token_matches(ctrl_lower, _CONFIRM_EXACT) or _is_native_confirm():
             # Confirmed — advance to message text
-            session["msg_compose"] = dict(compose, step="text")
+            compose["step"] = "text"
             session.modified = True
             return (
                 f"Great! Sending to {compose['to']}. "
@@ -1202,7 +1529,8 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
         else:
             # User said a different name — treat this utterance as the corrected name
             new_name = _normalize_contact_name(transcription)
-            session["msg_compose"] = dict(compose, to=new_name, step="to_confirm")
+            compose["to"] = new_name
+            compose["step"] = "to_confirm"
             session.modified = True
             return (
                 f"Got it. I heard {new_name}. "
@@ -1212,7 +1540,8 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
     # Step 2 — message text
     elif step == "text":
         text = transcription.strip()
-        session["msg_compose"] = dict(compose, text=text, step="confirm")
+        compose["text"] = text
+        compose["step"] = "confirm"
         session.modified = True
         return (
             f"Ready to send to {compose['to']}. "
@@ -1237,7 +1566,7 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
         else:
             session.pop("msg_compose", None)
             session.modified = True
-            return "Message cancelled. What else can I help you with?"
+            return _CANCEL_MSG_TEXT
 
     session.pop("msg_compose", None)
     return "Something went wrong. Message compose reset. Please try again."
@@ -1246,7 +1575,7 @@ def _handle_send_message(session: dict, transcription: str, eng_text: str = "")
 def _handle_cancel_message(session: dict) -> str:
     session.pop("msg_compose", None)
     session.modified = True
-    return "Message cancelled. What else can I help you with?"
+    return _CANCEL_MSG_TEXT
 
 
 def _handle_read_messages(session: dict) -> str:
@@ -1265,7 +1594,7 @@ def _handle_read_messages(session: dict) -> str:
 
 
 def _handle_logout() -> str:
-    return "You have been logged out. Goodbye!"
+    return _LOGOUT_TEXT
 
 
 
@@ -1336,9 +1665,10 @@ def _handle_service_choice(eng_text: str, orig_transcription: str, session: dict
     from services.lang_utils import translate_text, speak_multilang
     tts_lang = session.get("language", "en")
     tts_text = translate_text(resp, tts_lang)
-    tts_path = speak_multilang(tts_text, tts_lang)
-    if tts_path:
-        audio_url = f"/static/audio/{os.path.basename(tts_path)}"
+    if not Config.CLIENT_TTS:
+        tts_path = speak_multilang(tts_text, tts_lang)
+        if tts_path:
+            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
 
     return {
         "transcription":  orig_transcription,   # show original language to user
@@ -1346,6 +1676,8 @@ def _handle_service_choice(eng_text: str, orig_transcription: str, session: dict
         "service":        service,
         "response_text":  tts_text or resp,     # show translated text in UI
         "audio_url":      audio_url,
+        "client_tts":     Config.CLIENT_TTS,
+        "speak_text":     (tts_text or resp) if Config.CLIENT_TTS else None,
         "email_step":     None,
         "msg_step":       None,
         "voice_lang":     tts_lang,
@@ -1387,12 +1719,15 @@ def process_voice_command(audio_file: FileStorage, session: dict, choosing_servi
             "audio_url": str | None
         }
     """
-    # 1 — Save raw upload
-    temp_path = os.path.join(Config.UPLOAD_FOLDER, f"input_{uuid.uuid4().hex}.wav")
-    audio_file.save(temp_path)
-
-    # Early exit if Whisper model is not loaded
-    if _whisper_model is None:
+    # 1 — Save raw upload (1 MB chunks — far fewer syscalls than FileStorage.save)
+    # SCRATCH_FOLDER is tmpfs where available, so the clip never hits disk.
+    temp_path = os.path.join(Config.SCRATCH_FOLDER, f"input_{os.urandom(8).hex()}.wav")
+    with open(temp_path, "wb") as dst:
+        shutil.copyfileobj(audio_file.stream, dst, length=1024 * 1024)
+
+    # Early exit if the Whisper model load finished and failed (a load still
+    # in progress is fine — transcribe() waits for it)
+    if _whisper_load_failed():
         tts_path = speak_to_file("Whisper model failed to load. Please run: pip install openai-whisper")
         audio_url = f"/static/audio/{os.path.basename(tts_path)}" if tts_path else None
         try: os.remove(temp_path)
@@ -1433,33 +1768,51 @@ def process_voice_command(audio_file: FileStorage, session: dict, choosing_servi
     intent = _detect_intent(eng_text, session)
 
     # 4 — Execute intent
-    intent_map = {
-        "list_emails":       lambda: _handle_list_emails(session),
-        "read_email":        lambda: _handle_read_email(session),
-        "next_email":        lambda: _handle_next_email(session),
-        "prev_email":        lambda: _handle_prev_email(session),
-        "read_more":         lambda: _handle_read_more(session),
-        "send_email":        lambda: _handle_send_email(session, transcription, eng_text),
-        "stop_reading":      _handle_stop_reading,
-        "cancel_email":      lambda: _handle_cancel_email(session),
-        "summarize_email":   lambda: _handle_summarize_email(session),
-        "send_message":      lambda: _handle_send_message(session, transcription, eng_text),
-        "read_messages":     lambda: _handle_read_messages(session),
-        "cancel_message":    lambda: _handle_cancel_message(session),
-        "summarize_message": lambda: _handle_summarize_message(session),
-        "switch_service":    lambda: _handle_switch_service(session),
-        "set_language":      lambda: _handle_set_language(session),
-        "logout":            _handle_logout,
-        "help":              _handle_help,
-        "unknown":           lambda: _handle_unknown(transcription, session),
-    }
-    response_text = intent_map.get(intent, lambda: _handle_unknown(transcription))()
+    # Direct if/elif dispatch — the old dict-of-lambdas built ~17 closures
+    # per request just to call one of them.
+    if intent == "list_emails":
+        response_text = _handle_list_emails(session)
+    elif intent == "read_email":
+        response_text = _handle_read_email(session)
+    elif intent == "next_email":
+        response_text = _handle_next_email(session)
+    elif intent == "prev_email":
+        response_text = _handle_prev_email(session)
+    elif intent == "read_more":
+        response_text = _handle_read_more(session)
+    elif intent == "send_email":
+        response_text = _handle_send_email(session, transcription, eng_text)
+    elif intent == "stop_reading":
+        response_text = _handle_stop_reading()
+    elif intent == "cancel_email":
+        response_text = _handle_cancel_email(session)
+    elif intent == "summarize_email":
+        response_text = _handle_summarize_email(session)
+    elif intent == "send_message":
+        response_text = _handle_send_message(session, transcription, eng_text)
+    elif intent == "read_messages":
+        response_text = _handle_read_messages(session)
+    elif intent == "cancel_message":
+        response_text = _handle_cancel_message(session)
+    elif intent == "summarize_message":
+        response_text = _handle_summarize_message(session)
+    elif intent == "switch_service":
+        response_text = _handle_switch_service(session)
+    elif intent == "set_language":
+        response_text = _handle_set_language(session)
+    elif intent == "logout":
+        response_text = _handle_logout()
+    elif intent == "help":
+        response_text = _handle_help()
+    else:
+        response_text = _handle_unknown(transcription, session)
 
     # 5 — TTS (skip if response is empty, e.g. stop_reading)
     # For set_language the response is already in the target language (no translation needed).
     # For all other intents, translate the English response into the session language.
     audio_url = None
     tts_text = ""
+    tts_future = None
     if response_text:
         from services.lang_utils import translate_text, speak_multilang
         tts_lang = session.get("language", "en")
@@ -1467,30 +1820,68 @@ def process_voice_command(audio_file: FileStorage, session: dict, choosing_servi
             tts_text = response_text          # already in target language
         else:
             tts_text = translate_text(response_text, tts_lang)
-        tts_path = speak_multilang(tts_text, tts_lang)
-        if tts_path:
-            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
+        if not Config.CLIENT_TTS:
+            tts_future = _TTS_POOL.submit(speak_multilang, tts_text, tts_lang)
 
-    # Clean up input file
+    # Clean up input file while the TTS render runs
     try:
         os.remove(temp_path)
     except OSError:
         pass
 
+    if tts_future is not None:
+        tts_path = tts_future.result()
+        if tts_path:
+            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
+
+    email_c = session.get("email_compose")
+    msg_c   = session.get("msg_compose")
     return {
         "transcription": transcription,
         "intent":        intent,
         "response_text": tts_text or response_text,   # show translated text in UI
         "audio_url":     audio_url,
+        # When CLIENT_TTS is on, no WAV is rendered — the browser speaks
+        # speak_text via the Web Speech API instead of fetching audio_url.
+        "client_tts":    Config.CLIENT_TTS,
+        "speak_text":    (tts_text or response_text) if Config.CLIENT_TTS else None,
         "service":       session.get("active_service"),
         "voice_lang":    session.get("language", "en"),   # active language code for JS
         # Tells the frontend which compose step we are on (or null)
-        "email_step":    (session.get("email_compose") or {}).get("step"),
-        "msg_step":      (session.get("msg_compose")   or {}).get("step"),
+        "email_step":    email_c.get("step") if email_c else None,
+        "msg_step":      msg_c.get("step") if msg_c else None,
     }
 
 
 # ── Text-input path for compose fields (bypasses STT) ─────────────────────────
+_TYPED_YES_RE = re.compile(r'^(yes|y|confirm|ok|okay|correct|right|yep|yeah)$', re.I)
+
+
+def _typed_response(value: str, intent: str, response_text: str, session: dict) -> dict:
+    """
+    Render TTS (unless the client speaks) and build the response dict for
+    the typed compose paths. Both paths report both step pointers, matching
+    the shape process_voice_command returns.
+    """
+    audio_url = None
+    if response_text and not Config.CLIENT_TTS:
+        tts_path = speak_to_file(response_text)
+        if tts_path:
+            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
+    email_c = session.get("email_compose")
+    msg_c   = session.get("msg_compose")
+    return {
+        "transcription": f"[typed] {value}",
+        "intent":        intent,
+        "response_text": response_text,
+        "audio_url":     audio_url,
+        "client_tts":    Config.CLIENT_TTS,
+        "speak_text":    response_text if Config.CLIENT_TTS else None,
+        "email_step":    email_c.get("step") if email_c else None,
+        "msg_step":      msg_c.get("step") if msg_c else None,
+    }
+
+
 def process_text_compose_input(field: str, value: str, session: dict) -> dict:
     """
     Accepts a typed value for one compose field and advances the flow.
@@ -1514,22 +1905,26 @@ def process_text_compose_input(field: str, value: str, session: dict) -> dict:
                 "Please check and try again."
             )
         else:
-            session["email_compose"] = dict(compose, to=value, step="subject", to_retries=0)
+            compose["to"] = value
+            compose["step"] = "subject"
+            compose["to_retries"] = 0
             session.modified = True
-            readable = value.replace("@", " at ").replace(".", " dot ")
+            readable = _readable_email(value)
             response_text = f"Got it — sending to {readable}. Now say the subject."
 
     elif field == "subject":
-        session["email_compose"] = dict(compose, subject=value, step="body")
+        compose["subject"] = value
+        compose["step"] = "body"
         session.modified = True
         response_text = f"Subject: {value}. Now say your message."
 
     elif field == "body":
         to      = compose.get("to", "")
         subject = compose.get("subject", "")
-        session["email_compose"] = dict(compose, body=value, step="confirm")
+        compose["body"] = value
+        compose["step"] = "confirm"
         session.modified = True
-        readable_to = to.replace("@", " at ").replace(".", " dot ")
+        readable_to = _readable_email(to)
         response_text = (
             f"Ready to send. To: {readable_to}. Subject: {subject}. "
             f"Message: {value}. Say yes to confirm, or say cancel to stop."
@@ -1545,7 +1940,7 @@ def process_text_compose_input(field: str, value: str, session: dict) -> dict:
         try:
             success, message = send_email(session, to, subject, body_v)
             if success:
-                readable_to = to.replace("@", " at ").replace(".", " dot ")
+                readable_to = _readable_email(to)
                 response_text = f"Email sent successfully to {readable_to}!"
             else:
                 response_text = f"Failed to send email. {message}. Please try again."
@@ -1556,19 +1951,7 @@ def process_text_compose_input(field: str, value: str, session: dict) -> dict:
     else:
         response_text = "Unknown field."
 
-    audio_url = None
-    if response_text:
-        tts_path = speak_to_file(response_text)
-        if tts_path:
-            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
-
-    return {
-        "transcription": f"[typed] {value}",
-        "intent":        "send_email",
-        "response_text": response_text,
-        "audio_url":     audio_url,
-        "email_step":    (session.get("email_compose") or {}).get("step"),
-    }
+    return _typed_response(value, "send_email", response_text, session)
 
 
 def process_text_msg_input(field: str, value: str, session: dict) -> dict:
@@ -1586,7 +1969,8 @@ def process_text_msg_input(field: str, value: str, session: dict) -> dict:
 
     if field == "to":
         name = _normalize_contact_name(value)
-        session["msg_compose"] = dict(compose, to=name, step="to_confirm")
+        compose["to"] = name
+        compose["step"] = "to_confirm"
         session.modified = True
         response_text = (
             f"I have {name} as the recipient. "
@@ -1594,8 +1978,8 @@ def process_text_msg_input(field: str, value: str, session: dict) -> dict:
         )
 
     elif field == "to_confirm":
-        if re.match(r'^(yes|y|confirm|ok|okay|correct|right|yep|yeah)$', value.strip(), re.I):
-            session["msg_compose"] = dict(compose, step="text")
+        if _TYPED_YES_RE.match(value.strip()):
+            compose["step"] = "text"
             session.modified = True
             response_text = (
                 f"Recipient confirmed: {compose.get('to', '')}. "
@@ -1603,7 +1987,8 @@ def process_text_msg_input(field: str, value: str, session: dict) -> dict:
             )
         else:
             new_name = _normalize_contact_name(value)
-            session["msg_compose"] = dict(compose, to=new_name, step="to_confirm")
+            compose["to"] = new_name
+            compose["step"] = "to_confirm"
             session.modified = True
             response_text = (
                 f"Updated to {new_name}. "
@@ -1613,7 +1998,8 @@ def process_text_msg_input(field: str, value: str, session: dict) -> dict:
     elif field == "text":
         text = value.strip()
         to   = compose.get("to", "")
-        session["msg_compose"] = dict(compose, text=text, step="confirm")
+        compose["text"] = text
+        compose["step"] = "confirm"
         session.modified = True
         response_text = (
             f"Ready to send to {to}. "
@@ -1638,16 +2024,4 @@ def process_text_msg_input(field: str, value: str, session: dict) -> dict:
     else:
         response_text = "Unknown field."
 
-    audio_url = None
-    if response_text:
-        tts_path = speak_to_file(response_text)
-        if tts_path:
-            audio_url = f"/static/audio/{os.path.basename(tts_path)}"
-
-    return {
-        "transcription": f"[typed] {value}",
-        "intent":        "send_message",
-        "response_text": response_text,
-        "audio_url":     audio_url,
-        "msg_step":      (session.get("msg_compose") or {}).get("step"),
-    }
+    return _typed_response(value, "send_message", response_text, session)
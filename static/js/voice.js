@@ -24,6 +24,7 @@ let isRecording     = false;
 let recordTimeout   = null;
 let isSpeaking      = false;   // true while TTS audio is playing
 let _ttsAudio       = null;    // reference to current <audio> element
+let _ttsUtterance   = null;    // current SpeechSynthesisUtterance (CLIENT_TTS mode)
 let _emailStep      = null;    // current step of voice-guided email compose (or null)
 let _msgStep         = null;    // current step of voice-guided Telegram message compose
 let _activeService   = null;    // 'email' | 'telegram' | null — chosen by user at first tap
@@ -72,11 +73,8 @@ async function toggleRecording() {
       // Web Speech API watcher (used during TTS playback) also uses the
       // correct language immediately.
       if (data.voice_lang) _voiceLang = data.voice_lang;
-      if (data.audio_url) {
-        // TTS ends → _autoRestart → user speaks → processAndSend sends choosing_service=true
-        playTTS(data.audio_url);
-        return;
-      }
+      // TTS ends → _autoRestart → user speaks → processAndSend sends choosing_service=true
+      if (playResponse(data)) return;
     } catch (e) { /* network error — fall through and start mic directly */ }
   }
 
@@ -298,6 +296,7 @@ async function processAndSend(buffers) {
       // Instant cut — go idle, user taps when ready
       _stopSpeechWatcher();
       if (_ttsAudio) { _ttsAudio.pause(); _ttsAudio.src = ''; _ttsAudio = null; }
+      _cancelClientTTS();
       _setSpeakingUI(false);
       setStatus('✋ Stopped · Tap 🎤 to continue', 'idle');
       return;   // intentional idle — do NOT auto-restart
@@ -305,7 +304,7 @@ async function processAndSend(buffers) {
 
     if (data.intent === 'logout') {
       _releaseMic();
-      if (data.audio_url) playTTS(data.audio_url);
+      playResponse(data);
       setTimeout(() => { window.location.href = '/'; }, 2500);
       return;
     }
@@ -344,10 +343,8 @@ async function processAndSend(buffers) {
       : (intentLabels[data.intent] || ('Done • ' + (data.intent || '—')));
     setStatus(statusMsg, activeStep ? 'recording' : 'done');
 
-    if (data.audio_url) {
-      // playTTS → onended already calls _autoRestart, so we're covered
-      playTTS(data.audio_url);
-    } else {
+    // playResponse → end-of-speech handler already calls _autoRestart
+    if (!playResponse(data)) {
       // No TTS for this response (pyttsx3 failed, or TTS skipped) — restart anyway
       _autoRestart(600);
     }
@@ -434,6 +431,7 @@ function _startSpeechWatcher() {
             _stopSpeechWatcher();
             // Instant cut — no server trip, no TTS response
             if (_ttsAudio) { _ttsAudio.pause(); _ttsAudio.src = ''; _ttsAudio = null; }
+            _cancelClientTTS();
             _setSpeakingUI(false);
             // Go idle — do NOT auto-start recording (would immediately capture
             // silence / the tail of "stop" and trigger "I did not hear anything")
@@ -468,30 +466,40 @@ function _stopSpeechWatcher() {
 }
 
 // ── TTS playback ──────────────────────────────────────────────────────────────
+// Shared end-of-speech housekeeping (server WAV and Web Speech paths both
+// land here): show a contextual hint, then re-arm the mic.
+function _afterTTSEnd() {
+  _stopSpeechWatcher();
+  _setSpeakingUI(false);
+  const _emailReadIntents = new Set(['read_email','next_email','prev_email','read_more','list_emails','summarize_email']);
+  const _msgIntents       = new Set(['send_message','read_messages','cancel_message','summarize_message']);
+  if (_emailReadIntents.has(_lastIntent)) {
+    setStatus('🎤 Say "summarize email", "read more", "next", "previous" or "stop"', 'idle');
+  } else if (_msgIntents.has(_lastIntent)) {
+    setStatus('🎤 Say "send message", "read messages" or "summarize messages"', 'idle');
+  } else {
+    setStatus('🎤 Listening…', 'idle');
+  }
+  _autoRestart(500);
+}
+
 function playTTS(url) {
   if (_ttsAudio) { _ttsAudio.pause(); _ttsAudio.src = ''; _ttsAudio = null; }
+  _cancelClientTTS();
 
   const a = $('ttsAudio');
-  a.src = url + '?t=' + Date.now();
+  // No cache-buster: every render writes a fresh uuid-named file, so a URL
+  // never serves stale content — and repeated canned prompts resolve to the
+  // SAME url, which the immutable Cache-Control on /static/audio lets the
+  // browser replay from cache instead of re-downloading.
+  a.src = url;
   _ttsAudio = a;
 
   _setSpeakingUI(true);
 
   a.onended = () => {
     _ttsAudio = null;
-    _stopSpeechWatcher();
-    _setSpeakingUI(false);
-    // Show a contextual hint after TTS playback
-    const _emailReadIntents = new Set(['read_email','next_email','prev_email','read_more','list_emails','summarize_email']);
-    const _msgIntents       = new Set(['send_message','read_messages','cancel_message','summarize_message']);
-    if (_emailReadIntents.has(_lastIntent)) {
-      setStatus('🎤 Say "summarize email", "read more", "next", "previous" or "stop"', 'idle');
-    } else if (_msgIntents.has(_lastIntent)) {
-      setStatus('🎤 Say "send message", "read messages" or "summarize messages"', 'idle');
-    } else {
-      setStatus('🎤 Listening…', 'idle');
-    }
-    _autoRestart(500);
+    _afterTTSEnd();
   };
   a.onerror = () => {
     _ttsAudio = null;
@@ -512,10 +520,63 @@ function playTTS(url) {
     });
 }
 
+// ── Client-side TTS (CLIENT_TTS mode) ─────────────────────────────────────────
+// When the server returns speak_text instead of rendering a WAV, speak it
+// with the browser's Web Speech API. End-of-speech housekeeping mirrors
+// playTTS so auto-restart behaves the same on both paths.
+function speakText(text) {
+  if (_ttsAudio) { _ttsAudio.pause(); _ttsAudio.src = ''; _ttsAudio = null; }
+  _cancelClientTTS();
+
+  const u = new SpeechSynthesisUtterance(text);
+  const _langMap = { 'en': 'en-US', 'hi': 'hi-IN', 'mr': 'mr-IN' };
+  u.lang = _langMap[_voiceLang] || 'en-US';
+  _ttsUtterance = u;
+
+  _setSpeakingUI(true);
+
+  const done = () => {
+    if (_ttsUtterance !== u) return;   // cancelled or superseded — skip restart
+    _ttsUtterance = null;
+    _afterTTSEnd();
+  };
+  u.onend   = done;
+  u.onerror = done;
+
+  window.speechSynthesis.speak(u);
+  // Start instant stop-watcher the moment synthesis begins
+  _startSpeechWatcher();
+}
+
+// speechSynthesis.cancel() fires onend on the dropped utterance — clear the
+// reference first so its handler sees it was superseded and stays quiet.
+function _cancelClientTTS() {
+  if (_ttsUtterance) {
+    _ttsUtterance = null;
+    window.speechSynthesis.cancel();
+  }
+}
+
+// Route a voice response to whichever TTS path the server chose. Returns
+// true if something is now speaking (callers fall back to _autoRestart
+// when nothing is).
+function playResponse(data) {
+  if (data.client_tts && data.speak_text && window.speechSynthesis) {
+    speakText(data.speak_text);
+    return true;
+  }
+  if (data.audio_url) {
+    playTTS(data.audio_url);
+    return true;
+  }
+  return false;
+}
+
 // Called by ⏹ button or toggleRecording() while speaking
 function stopSpeaking() {
   _stopSpeechWatcher();
   if (_ttsAudio) { _ttsAudio.pause(); _ttsAudio.src = ''; _ttsAudio = null; }
+  _cancelClientTTS();
   _setSpeakingUI(false);
   // Go idle — user taps mic when ready for next command
   setStatus('✋ Stopped · Tap 🎤 to continue', 'idle');
@@ -705,8 +766,7 @@ async function submitMsgTypeIn() {
     };
     const statusMsg = _msgStep ? (msgStepLabels[_msgStep] || _msgStep) : ('Done \u2022 send_message');
     setStatus(statusMsg, _msgStep ? 'recording' : 'done');
-    if (data.audio_url) playTTS(data.audio_url);
-    else _autoRestart(600);
+    if (!playResponse(data)) _autoRestart(600);
   } catch (err) {
     setStatus('Network error: ' + err.message, 'error');
     _autoRestart(1500);
@@ -746,9 +806,7 @@ function _handleComposeResponse(data) {
     : ('Done • ' + (data.intent || '—'));
   setStatus(statusMsg, activeStep3 ? 'recording' : 'done');
 
-  if (data.audio_url) {
-    playTTS(data.audio_url);
-  } else {
+  if (!playResponse(data)) {
     _autoRestart(600);
   }
 }
@@ -0,0 +1,18 @@
+"""
+WSGI entrypoint — serve the Flask app under gunicorn with gevent workers.
+
+gevent's monkey-patching turns the blocking IMAP/SMTP/HTTP sockets used by
+fetch_emails / send_email / gTTS into cooperative greenlets, so one worker
+can multiplex hundreds of I/O-blocked requests instead of one at a time.
+The patch MUST run before anything else imports the socket/ssl modules,
+which is why this lives in its own module.
+
+Usage:
+    pip install gunicorn gevent
+    gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:app
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402  (import must follow monkey.patch_all)